@@ -1,87 +1,853 @@
+import asyncio
+import copy
 import json
 import os
 import datetime
+import time
+
+import snapshot
 
 SETTINGS_FILE = "echonet_settings.json"
 CHANNELS_FILE = "channels.json"
+# Append-only log of channel mutations since CHANNELS_FILE was last written
+JOURNAL_FILE = "channels.journal.jsonl"
+
+# Storage backend: "json" (default, flat files above) or "sqlite"
+STORAGE_BACKEND = os.getenv("ECHONET_STORAGE", "json").lower()
+DB_FILE = os.getenv("ECHONET_DB_FILE", "echonet.db")
+
+# JSON channel layout: "single" (everything in CHANNELS_FILE) or "sharded"
+# (one snapshot + journal per guild in CHANNELS_DIR)
+CHANNELS_LAYOUT = os.getenv("ECHONET_CHANNELS_LAYOUT", "single").lower()
+CHANNELS_DIR = os.getenv("ECHONET_CHANNELS_DIR", "channels")
+
+# Format channel snapshots are written in: "json" or "binary" (see
+# snapshot.py). Writing one format deletes the other; if both are present
+# (e.g. a checkout restored channels.json), this format is read first.
+SNAPSHOT_FORMAT = os.getenv("ECHONET_SNAPSHOT_FORMAT", "json").lower()
+
+# How long the channel store waits after a change before writing, so that
+# bursts of clicks are merged into a single flush.
+FLUSH_DELAY = 0.5
+
+# The journal is folded into a fresh snapshot once it has this many records,
+# or once it has any records and this many seconds have passed.
+COMPACT_EVERY = 1000
+COMPACT_INTERVAL = 600
+
+def write_json_atomic(path, data, indent=None):
+    """Write JSON to a temp file and rename it over the target.
+
+    A crash mid-write leaves the previous file intact instead of a truncated one.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        if indent is None:
+            json.dump(data, f, separators=(",", ":"))
+        else:
+            json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class JsonBackend:
+    """Flat-file storage: JSON settings, and channel snapshots plus journals.
+
+    Each channel mutation is appended to a journal as one small JSONL record
+    ({"op": ..., "id": ..., "data": ...}), so a click costs an O(1) append
+    instead of rewriting every channel. Records carry the full row, which
+    makes replaying them onto the snapshot idempotent. compact() folds a
+    journal back into its snapshot.
+
+    In the "sharded" layout each guild gets its own snapshot and journal in
+    CHANNELS_DIR, loaded lazily when the guild becomes available; only
+    records without a guild_id stay in CHANNELS_FILE. In the "single"
+    layout everything lives in CHANNELS_FILE / JOURNAL_FILE.
+    """
+
+    incremental = True
+
+    def __init__(self, sharded=False):
+        self.sharded = sharded
+        self.journal_entries = {}
+        self.last_compaction = {}
+        self.loaded_shards = set()
+        self._started = time.monotonic()
+
+    @property
+    def lazy(self):
+        """True if guilds are loaded one at a time with load_channels(guild_id)."""
+        return self.sharded
+
+    def load_settings(self):
+        if os.path.exists(SETTINGS_FILE):
+            with open(SETTINGS_FILE, "r") as f:
+                return json.load(f)
+        return {}
+
+    def save_settings(self, settings):
+        write_json_atomic(SETTINGS_FILE, settings, indent=2)
+
+    def shard_for(self, guild_id):
+        """Shard key for a guild; None is the shared CHANNELS_FILE."""
+        return guild_id if self.sharded else None
+
+    def _paths(self, shard):
+        """Snapshot path without extension, and journal path, for a shard."""
+        if shard is None:
+            return os.path.splitext(CHANNELS_FILE)[0], JOURNAL_FILE
+        base = os.path.join(CHANNELS_DIR, str(shard))
+        return base, f"{base}.journal.jsonl"
+
+    def read_snapshot(self, base):
+        """Read the snapshot at base, preferring SNAPSHOT_FORMAT's file; None if there is none.
+
+        The other format's file is only a fallback: modification times say
+        nothing about which is current once files are copied or checked out.
+        """
+        order = (".bin", ".json") if SNAPSHOT_FORMAT == "binary" else (".json", ".bin")
+        candidates = [f"{base}{ext}" for ext in order if os.path.exists(f"{base}{ext}")]
+        for path in candidates:
+            try:
+                if path.endswith(".bin"):
+                    return snapshot.read_snapshot(path)
+                with open(path, "r") as f:
+                    return json.load(f)
+            except (snapshot.SnapshotError, ValueError) as e:
+                print(f"Error reading channel snapshot {path}, trying fallback: {e}")
+        return None
+
+    def write_snapshot(self, base, rows, fmt=None):
+        fmt = fmt or SNAPSHOT_FORMAT
+        if fmt == "binary":
+            snapshot.write_snapshot_atomic(f"{base}.bin", rows)
+            stale = f"{base}.json"
+        else:
+            write_json_atomic(f"{base}.json", rows)
+            stale = f"{base}.bin"
+        # The journal is emptied next, so an older snapshot in the other
+        # format must not be read back in place of this one
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    def load_channels(self, guild_id=None):
+        """Load a shard's snapshot and replay its journal tail on top of it.
+
+        Rows from a binary snapshot are record tuples keyed by int ID rather
+        than dicts keyed by string ID; deserialize_temp_channels accepts both.
+        """
+        shard = self.shard_for(guild_id)
+        if guild_id is not None and shard is None:
+            # Single layout: the guild was loaded with everything else
+            return {}
+        snapshot_base, journal_path = self._paths(shard)
+        rows = self.read_snapshot(snapshot_base) or {}
+        int_keys = isinstance(next(iter(rows), None), int)
+        entries = 0
+        if os.path.exists(journal_path):
+            with open(journal_path, "r+") as f:
+                text = f.read()
+                if text and not text.endswith("\n"):
+                    # A crash mid-append left a partial record; drop it so
+                    # the next append starts on a fresh line
+                    text = text[:text.rfind("\n") + 1]
+                    f.truncate(len(text.encode()))
+            for line in text.splitlines():
+                record = json.loads(line)
+                channel_id = int(record["id"]) if int_keys else record["id"]
+                if record["op"] == "delete":
+                    rows.pop(channel_id, None)
+                else:
+                    rows[channel_id] = record["data"]
+                entries += 1
+        self.journal_entries[shard] = entries
+        self.loaded_shards.add(shard)
+        if shard is None and self.sharded:
+            rows = self._move_to_shards(rows)
+        return rows
+
+    def _move_to_shards(self, rows):
+        """Hand rows of the shared file that have a guild_id over to their guild's shard.
+
+        Happens after switching an existing install from the single layout.
+        The rows are appended to their shards' journals before the shared
+        file is rewritten without them, so a crash in between only leaves
+        duplicates, which the next load moves again. Returns the rows that
+        stay in the shared file.
+        """
+        rows = serialize_temp_channels(deserialize_temp_channels(rows))
+        moved = {channel_id: info for channel_id, info in rows.items() if info["guild_id"] is not None}
+        if not moved:
+            return rows
+        self.write_channels(moved)
+        rows = {channel_id: info for channel_id, info in rows.items() if channel_id not in moved}
+        self.compact(rows, {None})
+        return rows
+
+    def write_channels(self, rows, removed=None, full=False, ops=None):
+        """Append changed rows and deletions to their shards' journals.
+
+        removed maps channel ID -> guild ID so deletions reach the right shard.
+        """
+        if full:
+            self.compact(rows)
+            return
+        removed = removed or {}
+        ops = ops or {}
+        lines = {}
+        for channel_id, info in rows.items():
+            record = {"op": ops.get(channel_id, "update"), "id": channel_id, "data": info}
+            shard = self.shard_for(info.get("guild_id"))
+            lines.setdefault(shard, []).append(json.dumps(record, separators=(",", ":")))
+        for channel_id, guild_id in removed.items():
+            record = {"op": "delete", "id": str(channel_id)}
+            shard = self.shard_for(guild_id)
+            lines.setdefault(shard, []).append(json.dumps(record, separators=(",", ":")))
+        for shard, shard_lines in lines.items():
+            journal_path = self._paths(shard)[1]
+            if shard is not None:
+                os.makedirs(CHANNELS_DIR, exist_ok=True)
+            with open(journal_path, "a") as f:
+                f.write("\n".join(shard_lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.journal_entries[shard] = self.journal_entries.get(shard, 0) + len(shard_lines)
+
+    def shards_to_compact(self):
+        """Shards whose journal is long or old enough to fold into a snapshot."""
+        now = time.monotonic()
+        # An unloaded shard's snapshot holds channels that aren't in memory,
+        # so only loaded shards can be rewritten from memory
+        return {
+            shard for shard, entries in self.journal_entries.items()
+            if shard in self.loaded_shards
+            and (entries >= COMPACT_EVERY
+                 or (entries and now - self.last_compaction.get(shard, self._started) >= COMPACT_INTERVAL))
+        }
+
+    def compact(self, rows, shards=None):
+        """Write rows as the new snapshots of the given shards and empty their journals.
+
+        Without shards, every loaded shard is rewritten (rows must then
+        hold all loaded channels). Rows belonging to shards that haven't
+        been loaded are appended to those shards' journals instead, so the
+        channels already on disk there are kept.
+        """
+        grouped = {}
+        for channel_id, info in rows.items():
+            grouped.setdefault(self.shard_for(info.get("guild_id")), {})[channel_id] = info
+        if shards is None:
+            shards = set(self.loaded_shards)
+            unloaded = {
+                channel_id: info
+                for shard, shard_rows in grouped.items() if shard not in shards
+                for channel_id, info in shard_rows.items()
+            }
+            if unloaded:
+                self.write_channels(unloaded)
+        # Guild shards first: rows moving out of the shared file (e.g. after
+        # a guild_id backfill) must land in their shard before they leave it
+        for shard in sorted(shards, key=lambda shard: shard is None):
+            snapshot_base, journal_path = self._paths(shard)
+            if shard is not None:
+                os.makedirs(CHANNELS_DIR, exist_ok=True)
+            self.write_snapshot(snapshot_base, grouped.get(shard, {}))
+            # Anything still in the journal is already folded into the snapshot
+            with open(journal_path, "w"):
+                pass
+            self.journal_entries[shard] = 0
+            self.last_compaction[shard] = time.monotonic()
+
+    def delete_guild(self, guild_id):
+        """Drop a guild's shard files. A no-op in the single layout."""
+        shard = self.shard_for(guild_id)
+        if shard is None:
+            return
+        snapshot_base, journal_path = self._paths(shard)
+        for path in (f"{snapshot_base}.json", f"{snapshot_base}.bin", journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.journal_entries.pop(shard, None)
+        self.loaded_shards.discard(shard)
+
+_backend = None
+
+def get_backend():
+    """Return the configured storage backend, creating it on first use."""
+    global _backend
+    if _backend is None:
+        if STORAGE_BACKEND == "sqlite":
+            from sqlite_store import SQLiteBackend
+            _backend = SQLiteBackend(DB_FILE)
+        else:
+            _backend = JsonBackend(sharded=CHANNELS_LAYOUT == "sharded")
+    return _backend
+
+class SettingsCache:
+    """Guild settings held in memory, read from storage once.
+
+    The cache is only replaced when save_settings() writes, which is also
+    when the set of menu text channel IDs is recomputed, so hot paths like
+    on_message can check a channel with a single set lookup.
+
+    Frequent bookkeeping values (purge cursors, menu message IDs) are
+    changed in place and persisted with save_settings_later(): a background
+    flush writes a copy on a worker thread at most once every FLUSH_DELAY
+    seconds, like the channel store.
+    """
+
+    def __init__(self):
+        self.settings = None
+        self.menu_channel_ids = set()
+        self._dirty = False
+        self._writing = False
+        self._flush_task = None
+        self._write_lock = asyncio.Lock()
+
+    def get(self):
+        if self.settings is None:
+            self.update(get_backend().load_settings())
+        return self.settings
+
+    def update(self, settings):
+        self.settings = settings
+        self.menu_channel_ids = {
+            guild_settings["text_channel_id"]
+            for guild_settings in settings.values()
+            if guild_settings.get("text_channel_id")
+        }
+
+    def saved(self):
+        """save_settings() just wrote everything; a write already in flight is older, so redo it after."""
+        self._dirty = self._writing
+
+    def schedule_flush(self):
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (e.g. a maintenance script): write right away
+            self._dirty = False
+            get_backend().save_settings(self.settings)
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while self._dirty:
+            await asyncio.sleep(FLUSH_DELAY)
+            if not await self.flush():
+                return  # Leave it dirty; the next change retries
+
+    async def flush(self):
+        """Write pending changes now, off the event loop. Returns False if the write failed."""
+        async with self._write_lock:
+            if not self._dirty:
+                return True
+            self._dirty = False
+            # Copy on the loop so the worker thread sees a consistent snapshot
+            settings = copy.deepcopy(self.settings)
+            self._writing = True
+            try:
+                await asyncio.to_thread(get_backend().save_settings, settings)
+            except Exception as e:
+                self._dirty = True
+                print(f"Error saving settings: {e}")
+                return False
+            finally:
+                self._writing = False
+            return True
+
+settings_cache = SettingsCache()
 
 def load_settings():
-    """Load bot settings from JSON file."""
-    if os.path.exists(SETTINGS_FILE):
-        with open(SETTINGS_FILE, "r") as f:
-            return json.load(f)
-    return {}
+    """Return bot settings from the in-memory cache.
+
+    The returned dict is shared; call save_settings() after changing it.
+    """
+    return settings_cache.get()
 
 def save_settings(settings):
-    """Save bot settings to JSON file."""
-    with open(SETTINGS_FILE, "w") as f:
-        json.dump(settings, f, indent=2)
-
-def load_temp_channels():
-    """Load temporary channel data from JSON file."""
-    temp_channels = {}
-    if os.path.exists(CHANNELS_FILE):
-        try:
-            with open(CHANNELS_FILE, "r") as f:
-                data = json.load(f)
-                for channel_id, info in data.items():
-                    temp_channels[int(channel_id)] = {
-                        "owner_id": info["owner_id"],
-                        "expires_at": datetime.datetime.fromisoformat(info["expires_at"]),
-                        "request_only": info["request_only"],
-                        "pending_requests": info.get("pending_requests", []),
-                        "menu_message_id": info.get("menu_message_id"),
-                        "menu_channel_id": info.get("menu_channel_id"),
-                        "blocked_users": info.get("blocked_users", [])
-                    }
-        except Exception as e:
-            print(f"Error loading channel data: {e}")
-            temp_channels = {}
-    return temp_channels
+    """Save bot settings to storage and refresh the cache."""
+    get_backend().save_settings(settings)
+    settings_cache.update(settings)
+    settings_cache.saved()
 
-def save_temp_channels(temp_channels):
-    """Save temporary channel data to JSON file."""
-    data = {}
-    for channel_id, info in temp_channels.items():
-        data[str(channel_id)] = {
-            "owner_id": info["owner_id"],
-            "expires_at": info["expires_at"].isoformat(),
-            "request_only": info["request_only"],
-            "pending_requests": info.get("pending_requests", []),
-            "menu_message_id": info.get("menu_message_id"),
-            "menu_channel_id": info.get("menu_channel_id"),
-            "blocked_users": info.get("blocked_users", []),
-            "user_limit": info.get("user_limit")
+def save_settings_later():
+    """Persist in-place changes to the cached settings from a background flush."""
+    settings_cache.schedule_flush()
+
+def is_menu_channel(channel_id):
+    """Return True if the channel is a configured EchoNet menu channel."""
+    settings_cache.get()
+    return channel_id in settings_cache.menu_channel_ids
+
+def epoch_now():
+    """Current time as integer epoch seconds."""
+    return int(time.time())
+
+def to_epoch(value):
+    """Convert a stored expiry (epoch int or legacy naive-UTC ISO string) to epoch seconds."""
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return int(value.timestamp())
+    return int(value)
+
+# Shared stand-in for an empty pending_requests / blocked_users, so records
+# without any don't each carry an empty dict and set
+_EMPTY = frozenset()
+
+class TempChannel:
+    """A temporary voice channel record.
+
+    expires_at is integer epoch seconds (UTC). pending_requests is an
+    insertion-ordered set (a dict of user ID -> None) and blocked_users a
+    set, so membership checks and removals are O(1). Either is the shared
+    _EMPTY frozenset while empty; change them through the methods below.
+    """
+
+    __slots__ = (
+        "owner_id",
+        "guild_id",
+        "expires_at",
+        "request_only",
+        "pending_requests",
+        "blocked_users",
+        "menu_message_id",
+        "menu_channel_id",
+        "user_limit",
+    )
+
+    def __init__(self, owner_id, expires_at, request_only, pending_requests=(), blocked_users=(),
+                 menu_message_id=None, menu_channel_id=None, user_limit=None, guild_id=None):
+        self.owner_id = owner_id
+        self.guild_id = guild_id
+        self.expires_at = to_epoch(expires_at)
+        self.request_only = bool(request_only)
+        self.pending_requests = dict.fromkeys(pending_requests) if pending_requests else _EMPTY
+        self.blocked_users = set(blocked_users) if blocked_users else _EMPTY
+        self.menu_message_id = menu_message_id
+        self.menu_channel_id = menu_channel_id
+        self.user_limit = user_limit
+
+    @property
+    def expires_datetime(self):
+        """Expiry as a naive UTC datetime, for display."""
+        return datetime.datetime.fromtimestamp(self.expires_at, datetime.timezone.utc).replace(tzinfo=None)
+
+    def is_expired(self, now=None):
+        return self.expires_at <= (epoch_now() if now is None else now)
+
+    def add_request(self, user_id):
+        if self.pending_requests is _EMPTY:
+            self.pending_requests = {}
+        self.pending_requests[user_id] = None
+
+    def remove_request(self, user_id):
+        """Drop a pending request. Returns True if there was one."""
+        if user_id in self.pending_requests:
+            del self.pending_requests[user_id]
+            if not self.pending_requests:
+                self.pending_requests = _EMPTY
+            return True
+        return False
+
+    def remove_requests(self, user_ids):
+        """Drop several pending requests. Returns the IDs that were pending."""
+        return [user_id for user_id in user_ids if self.remove_request(user_id)]
+
+    def block(self, user_id):
+        """Block a user. Returns True if they weren't blocked already."""
+        if user_id in self.blocked_users:
+            return False
+        if self.blocked_users is _EMPTY:
+            self.blocked_users = set()
+        self.blocked_users.add(user_id)
+        return True
+
+    def unblock(self, user_id):
+        """Unblock a user. Returns True if they were blocked."""
+        if user_id in self.blocked_users:
+            self.blocked_users.discard(user_id)
+            if not self.blocked_users:
+                self.blocked_users = _EMPTY
+            return True
+        return False
+
+    @classmethod
+    def from_dict(cls, info):
+        return cls(
+            owner_id=info["owner_id"],
+            expires_at=info["expires_at"],
+            request_only=info["request_only"],
+            pending_requests=info.get("pending_requests", ()),
+            blocked_users=info.get("blocked_users", ()),
+            menu_message_id=info.get("menu_message_id"),
+            menu_channel_id=info.get("menu_channel_id"),
+            user_limit=info.get("user_limit"),
+            guild_id=info.get("guild_id"),
+        )
+
+    @classmethod
+    def from_record(cls, owner_id, guild_id, expires_at, request_only, pending_requests, blocked_users,
+                    menu_message_id, menu_channel_id, user_limit):
+        """Build from an already-normalized binary snapshot record, skipping __init__'s conversions."""
+        self = cls.__new__(cls)
+        self.owner_id = owner_id
+        self.guild_id = guild_id
+        self.expires_at = expires_at
+        self.request_only = request_only
+        self.pending_requests = dict.fromkeys(pending_requests) if pending_requests else _EMPTY
+        self.blocked_users = set(blocked_users) if blocked_users else _EMPTY
+        self.menu_message_id = menu_message_id
+        self.menu_channel_id = menu_channel_id
+        self.user_limit = user_limit
+        return self
+
+    def to_dict(self):
+        """JSON-ready copy; safe to hand to another thread."""
+        return {
+            "owner_id": self.owner_id,
+            "guild_id": self.guild_id,
+            "expires_at": self.expires_at,
+            "request_only": self.request_only,
+            "pending_requests": list(self.pending_requests),
+            "menu_message_id": self.menu_message_id,
+            "menu_channel_id": self.menu_channel_id,
+            "blocked_users": list(self.blocked_users),
+            "user_limit": self.user_limit,
         }
 
-    with open(CHANNELS_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+def deserialize_temp_channels(data):
+    """Convert stored channel rows back into TempChannel records keyed by int ID.
+
+    Binary snapshot rows (int key, record tuple) take a fast path that
+    skips the key conversion and from_dict's normalization.
+    """
+    from_record = TempChannel.from_record
+    from_dict = TempChannel.from_dict
+    return {
+        channel_id if type(channel_id) is int else int(channel_id):
+            from_record(*info) if type(info) is tuple else from_dict(info)
+        for channel_id, info in data.items()
+    }
+
+def load_temp_channels(guild_id=None):
+    """Load temporary channel data from storage.
+
+    With a lazy backend, no guild_id loads only channels not yet tied to a
+    guild; pass a guild_id to load that guild's channels.
+    """
+    try:
+        return deserialize_temp_channels(get_backend().load_channels(guild_id))
+    except Exception as e:
+        print(f"Error loading channel data: {e}")
+        return {}
+
+def serialize_temp_channels(temp_channels):
+    """Convert TempChannel records into JSON-ready rows keyed by string ID."""
+    return {str(channel_id): info.to_dict() for channel_id, info in temp_channels.items()}
 
 def save_temp_channels(temp_channels):
-    """Save temporary channel data to JSON file."""
-    data = {}
-    for channel_id, info in temp_channels.items():
-        data[str(channel_id)] = {
-            "owner_id": info["owner_id"],
-            "expires_at": info["expires_at"].isoformat(),
-            "request_only": info["request_only"],
-            "pending_requests": info.get("pending_requests", []),
-            "menu_message_id": info.get("menu_message_id"),
-            "menu_channel_id": info.get("menu_channel_id"),
-            "blocked_users": info.get("blocked_users", []),
-            "user_limit": info.get("user_limit")
-        }
-    with open(CHANNELS_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    """Write every given channel to storage in one go."""
+    get_backend().write_channels(serialize_temp_channels(temp_channels), full=True)
 
 def add_temp_channel(channel_id, owner_id, expires_at, request_only, menu_message_id=None, menu_channel_id=None):
     """Add a new temporary channel to the data."""
-    return {
-        "owner_id": owner_id,
-        "expires_at": expires_at,
-        "request_only": request_only,
-        "pending_requests": [],
-        "menu_message_id": menu_message_id,
-        "menu_channel_id": menu_channel_id,
-        "blocked_users": []
-    }
+    return TempChannel(
+        owner_id=owner_id,
+        expires_at=expires_at,
+        request_only=request_only,
+        menu_message_id=menu_message_id,
+        menu_channel_id=menu_channel_id,
+    )
+
+
+class ChannelStore:
+    """Process-wide in-memory store of temporary channels.
+
+    Loaded once at startup and shared by main.py and menus.py, so lookups
+    never touch the disk. Mutations call save(), which only marks the store
+    dirty; a background flush writes to the backend on a worker thread at
+    most once every FLUSH_DELAY seconds. Passing the channel ID (and a short
+    op name such as "extend" or "block") lets the backend journal or upsert
+    just that row.
+
+    With a lazy backend (sharded JSON, SQLite) each guild's channels are
+    read by load_guild() once that guild becomes available.
+
+    Listeners registered with subscribe() are told about every channel that
+    is loaded, saved or removed, e.g. to keep the expiry scheduler in sync.
+    The same hook keeps the owner_id and guild_id indexes behind owned_by()
+    and in_guild() current, so those cost O(result).
+    """
+
+    def __init__(self):
+        self.channels = {}
+        self.loaded = False
+        self.loaded_guilds = set()
+        # guild ID -> task reading that guild's channels
+        self._guild_loads = {}
+        self._changed = {}
+        self._removed = {}
+        self._full = False
+        self._flush_task = None
+        self._write_lock = asyncio.Lock()
+        self._listeners = []
+        # owner_id / guild_id -> {channel_id: None}, plus what each channel is filed under
+        self._by_owner = {}
+        self._by_guild = {}
+        self._indexed = {}
+
+    @property
+    def dirty(self):
+        return self._full or bool(self._changed) or bool(self._removed)
+
+    def subscribe(self, callback):
+        """Call callback(channel_id, info) whenever a channel is loaded or saved; info is None once removed."""
+        self._listeners.append(callback)
+
+    def _reindex(self, channel_id, info):
+        old = self._indexed.pop(channel_id, None)
+        new = None if info is None else (info.owner_id, info.guild_id)
+        if old == new:
+            if new is not None:
+                self._indexed[channel_id] = new
+            return
+        if old is not None:
+            for index, key in ((self._by_owner, old[0]), (self._by_guild, old[1])):
+                ids = index.get(key)
+                if ids is not None:
+                    ids.pop(channel_id, None)
+                    if not ids:
+                        del index[key]
+        if new is not None:
+            self._by_owner.setdefault(new[0], {})[channel_id] = None
+            self._by_guild.setdefault(new[1], {})[channel_id] = None
+            self._indexed[channel_id] = new
+
+    def _notify(self, channel_id, info):
+        self._reindex(channel_id, info)
+        for callback in self._listeners:
+            callback(channel_id, info)
+
+    def load(self):
+        """Load channel data from storage, replacing anything in memory."""
+        for channel_id in self.channels:
+            self._notify(channel_id, None)
+        self.channels = load_temp_channels()
+        self.loaded_guilds = set()
+        self._guild_loads = {}
+        self.loaded = True
+        for channel_id, info in self.channels.items():
+            self._notify(channel_id, info)
+        return self.channels
+
+    async def load_guild(self, guild_id):
+        """Load one guild's channels if the backend loads lazily and they aren't in memory yet.
+
+        Concurrent callers for the same guild all wait for the one load.
+        """
+        if not self.loaded:
+            self.load()
+        if not get_backend().lazy:
+            return
+        task = self._guild_loads.get(guild_id)
+        if task is None:
+            task = self._guild_loads[guild_id] = asyncio.ensure_future(self._load_guild(guild_id))
+        await task
+
+    async def _load_guild(self, guild_id):
+        # Hold the write lock so no flush or compaction touches the shard mid-read
+        async with self._write_lock:
+            channels = await asyncio.to_thread(load_temp_channels, guild_id)
+            for channel_id, info in channels.items():
+                # Anything created while the load was in flight is newer
+                if channel_id not in self.channels:
+                    self.channels[channel_id] = info
+                    self._notify(channel_id, info)
+            self.loaded_guilds.add(guild_id)
+
+    def drop_guild(self, guild_id):
+        """Forget every channel of a guild and delete its stored data."""
+        backend = get_backend()
+        has_shard = backend.shard_for(guild_id) is not None
+        for channel_id in [cid for cid, info in self.channels.items() if info.guild_id == guild_id]:
+            if has_shard:
+                # The whole shard is deleted below; no per-row writes needed
+                del self.channels[channel_id]
+                self._changed.pop(channel_id, None)
+                self._notify(channel_id, None)
+            else:
+                self.remove(channel_id)
+        self.loaded_guilds.discard(guild_id)
+        self._guild_loads.pop(guild_id, None)
+        backend.delete_guild(guild_id)
+
+    def save(self, channel_id=None, op="update"):
+        """Schedule a channel (or, without an ID, everything) to be persisted."""
+        if channel_id is None:
+            self._full = True
+            for cid, info in self.channels.items():
+                self._notify(cid, info)
+        else:
+            self._removed.pop(channel_id, None)
+            self._changed[channel_id] = op
+            if channel_id in self.channels:
+                self._notify(channel_id, self.channels[channel_id])
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (e.g. a maintenance script): write right away
+            self.flush_sync()
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_loop())
+
+    def _take_pending(self):
+        """Serialize pending changes and reset the dirty state."""
+        backend = get_backend()
+        full = self._full or not backend.incremental
+        if full:
+            rows = serialize_temp_channels(self.channels)
+        else:
+            rows = serialize_temp_channels(
+                {cid: self.channels[cid] for cid in self._changed if cid in self.channels}
+            )
+        ops = {str(cid): op for cid, op in self._changed.items()}
+        removed = {str(cid): guild_id for cid, guild_id in self._removed.items()}
+        self._changed = {}
+        self._removed = {}
+        self._full = False
+        return backend, (rows, removed, full, ops)
+
+    def _restore_pending(self, changed, removed, full):
+        """Put a batch that failed to write back into the pending sets.
+
+        Anything that changed again since the batch was taken is newer and
+        wins; a removal is only restored if the channel hasn't come back.
+        """
+        for channel_id, op in changed.items():
+            if channel_id in self.channels and channel_id not in self._removed:
+                self._changed.setdefault(channel_id, op)
+        for channel_id, guild_id in removed.items():
+            if channel_id not in self.channels:
+                self._removed.setdefault(channel_id, guild_id)
+        self._full = self._full or full
+
+    async def _flush_loop(self):
+        while self.dirty:
+            await asyncio.sleep(FLUSH_DELAY)
+            await self.flush()
+
+    async def flush(self):
+        """Write pending changes now, off the event loop."""
+        async with self._write_lock:
+            if not self.dirty:
+                return
+            taken = (dict(self._changed), dict(self._removed), self._full)
+            # Serialize on the loop so the snapshot is consistent
+            backend, batch = self._take_pending()
+            try:
+                await asyncio.to_thread(backend.write_channels, *batch)
+            except Exception as e:
+                # Retry the same changes and deletions on the next flush
+                self._restore_pending(*taken)
+                print(f"Error saving channel data: {e}")
+                return
+            shards = backend.shards_to_compact()
+            if shards:
+                rows = serialize_temp_channels({
+                    cid: info for cid, info in self.channels.items()
+                    if backend.shard_for(info.guild_id) in shards
+                })
+                try:
+                    await asyncio.to_thread(backend.compact, rows, shards)
+                except Exception as e:
+                    print(f"Error compacting channel journal: {e}")
+
+    def flush_sync(self):
+        """Write pending changes from outside the event loop (e.g. after shutdown)."""
+        if not self.dirty:
+            return
+        backend, batch = self._take_pending()
+        backend.write_channels(*batch)
+
+    def get(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def items(self):
+        return self.channels.items()
+
+    def __contains__(self, channel_id):
+        return channel_id in self.channels
+
+    def __len__(self):
+        return len(self.channels)
+
+    def __iter__(self):
+        return iter(self.channels)
+
+    def add(self, channel_id, info):
+        """Register a new temporary channel and persist it."""
+        self.channels[channel_id] = info
+        self.save(channel_id, "create")
+
+    def remove(self, channel_id):
+        """Forget a temporary channel. Returns its data, or None if unknown."""
+        info = self.channels.pop(channel_id, None)
+        if info is not None:
+            self._changed.pop(channel_id, None)
+            self._removed[channel_id] = info.guild_id
+            self._notify(channel_id, None)
+            self._schedule_flush()
+        return info
+
+    def owned_by(self, user_id, guild_id=None):
+        """Return the IDs of all channels owned by a user, optionally only in one guild."""
+        return [
+            cid for cid in self._by_owner.get(user_id, ())
+            if guild_id is None or self.channels[cid].guild_id == guild_id
+        ]
+
+    def in_guild(self, guild_id):
+        """Return (channel ID, record) pairs for every channel in a guild."""
+        return [(cid, self.channels[cid]) for cid in self._by_guild.get(guild_id, ())]
+
+    def set_owner(self, channel_id, owner_id):
+        """Transfer a channel to a new owner and persist it."""
+        self.channels[channel_id].owner_id = owner_id
+        self.save(channel_id, "transfer")
+
+    async def backfill_guild_ids(self, resolve):
+        """Set guild_id on records saved before it was tracked.
+
+        resolve(channel_id) returns the guild ID or None if the channel
+        can't be found. Each guild's own channels are loaded first, so the
+        full save that moves fixed records into their guild's shard never
+        runs against a shard that is only partly in memory. Returns how
+        many were fixed.
+        """
+        resolved = {}
+        for channel_id, info in self.channels.items():
+            if info.guild_id is None:
+                guild_id = resolve(channel_id)
+                if guild_id is not None:
+                    resolved[channel_id] = guild_id
+        if not resolved:
+            return 0
+        await asyncio.gather(*(self.load_guild(guild_id) for guild_id in set(resolved.values())))
+        for channel_id, guild_id in resolved.items():
+            info = self.channels.get(channel_id)
+            if info is not None and info.guild_id is None:
+                info.guild_id = guild_id
+        self.save()
+        return len(resolved)
+
+channel_store = ChannelStore()
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import discord
+
+from rest_queue import rest_queue, BACKGROUND
+
+# How long a message stays visible before it is deleted
+LINGER = 2
+# Extra wait after the oldest message is due, so messages posted just
+# after it are old enough to go out in the same bulk call
+BATCH_SLACK = 0.25
+
+class DeleteQueue:
+    """Per-channel buffer of messages to delete.
+
+    Each message stays up for LINGER seconds after it is queued. A
+    per-channel task wakes shortly after the oldest message is due and deletes
+    every message that has lingered long enough in one delete_messages
+    bulk call (single deletes only for a lone message or if the bulk call
+    fails); the rest wait for the next wake-up.
+    """
+
+    def __init__(self):
+        # channel ID -> [(queued at, message)], oldest first
+        self._pending = {}
+        self._tasks = set()
+
+    def add(self, message):
+        pending = self._pending.get(message.channel.id)
+        if pending is None:
+            pending = self._pending[message.channel.id] = []
+            task = asyncio.get_running_loop().create_task(self._flush_loop(message.channel))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        pending.append((time.monotonic(), message))
+
+    async def _flush_loop(self, channel):
+        pending = self._pending[channel.id]
+        while pending:
+            await asyncio.sleep(max(pending[0][0] + LINGER + BATCH_SLACK - time.monotonic(), 0))
+            now = time.monotonic()
+            due = 0
+            while due < len(pending) and pending[due][0] + LINGER <= now:
+                due += 1
+            messages = [message for _, message in pending[:due]]
+            del pending[:due]
+            try:
+                # Delete messages in batches of 100 (Discord's bulk delete limit)
+                for start in range(0, len(messages), 100):
+                    await self._delete_batch(channel, messages[start:start + 100])
+            except Exception as e:
+                print(f"Error deleting messages in menu channel {channel.id}: {e}")
+        del self._pending[channel.id]
+
+    async def _delete_batch(self, channel, batch):
+        if len(batch) > 1:
+            try:
+                await rest_queue.submit(channel.delete_messages(batch), BACKGROUND, "bulk_delete", channel.id)
+                return
+            except discord.HTTPException:
+                pass  # fall back to deleting one by one
+        for message in batch:
+            try:
+                await rest_queue.submit(message.delete(), BACKGROUND, "message_delete", channel.id)
+            except (discord.NotFound, discord.Forbidden):
+                pass  # already gone, or we can't manage messages here
+
+delete_queue = DeleteQueue()
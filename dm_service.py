@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+import discord
+
+from rest_queue import rest_queue, USER
+
+# Identical notices to the same user within this many seconds are sent once
+DEDUPE_WINDOW = 60
+# Join requests to one owner's channel within this many seconds of the
+# first are folded into a single digest DM
+DIGEST_WINDOW = 60
+# Attempts per DM when Discord answers with a server error
+MAX_ATTEMPTS = 3
+# DM channels remembered, oldest dropped first
+DM_CACHE_SIZE = 2048
+
+class DMService:
+    """Sends direct messages with a DM channel cache, dedupe, retry and digests.
+
+    send() delivers one DM and reports whether it arrived; notify() does
+    the same in the background so a handler doesn't wait on it.
+    join_request() sends the first request for a channel right away and
+    folds any that follow within DIGEST_WINDOW into one digest.
+    """
+
+    def __init__(self):
+        self._dm_channels = {}
+        self._recent = {}
+        self._digests = {}
+        self._tasks = set()
+        self.stats = {"sent": 0, "deduped": 0, "failed": 0, "digested": 0}
+
+    async def _dm_channel(self, user, priority):
+        dm = self._dm_channels.pop(user.id, None) or user.dm_channel
+        if dm is None:
+            dm = await rest_queue.submit(user.create_dm(), priority, "dm")
+        self._dm_channels[user.id] = dm
+        if len(self._dm_channels) > DM_CACHE_SIZE:
+            del self._dm_channels[next(iter(self._dm_channels))]
+        return dm
+
+    def _is_duplicate(self, user_id, key):
+        now = time.monotonic()
+        if len(self._recent) > DM_CACHE_SIZE:
+            self._recent = {k: sent for k, sent in self._recent.items() if now - sent < DEDUPE_WINDOW}
+        sent = self._recent.get((user_id, key))
+        if sent is not None and now - sent < DEDUPE_WINDOW:
+            return True
+        self._recent[(user_id, key)] = now
+        return False
+
+    async def send(self, user, content=None, *, embed=None, view=None, key=None, priority=USER):
+        """DM a user. Returns True if delivered, False if not (DMs closed, repeated errors, duplicate)."""
+        key = key if key is not None else content
+        if key is not None and self._is_duplicate(user.id, key):
+            self.stats["deduped"] += 1
+            return False
+        kwargs = {"content": content, "embed": embed}
+        if view is not None:
+            kwargs["view"] = view
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                dm = await self._dm_channel(user, priority)
+                await rest_queue.submit(dm.send(**kwargs), priority, "dm", dm.id)
+                self.stats["sent"] += 1
+                return True
+            except discord.Forbidden:
+                break  # DMs closed; retrying won't help
+            except discord.HTTPException as e:
+                if e.status < 500 or attempt == MAX_ATTEMPTS - 1:
+                    print(f"Error sending DM to {user.id}: {e}")
+                    break
+                await asyncio.sleep(2 ** attempt)
+        self.stats["failed"] += 1
+        if key is not None:
+            # Let a later attempt at the same notice through
+            self._recent.pop((user.id, key), None)
+        return False
+
+    def _spawn(self, coro):
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def notify(self, user, content=None, **kwargs):
+        """send() in the background; returns the task."""
+        return self._spawn(self.send(user, content, **kwargs))
+
+    async def join_request(self, owner, requester, channel, embed, view):
+        """Tell an owner about a join request, digesting bursts for the same channel.
+
+        Returns False only if the immediate DM could not be delivered, so
+        the caller can fall back to pinging the owner in the guild; no
+        digest is started then.
+        """
+        digest_key = (owner.id, channel.id)
+        if digest_key in self._digests:
+            self._digests[digest_key].append(requester)
+            self.stats["digested"] += 1
+            return True
+        # The digest only opens once the first DM is delivered, so a request
+        # is never folded into a digest that won't reach the owner
+        if not await self.send(owner, embed=embed, view=view, key=("join_request", channel.id, requester.id)):
+            return False
+        if digest_key not in self._digests:
+            self._digests[digest_key] = []
+            self._spawn(self._send_digest(owner, channel, digest_key))
+        return True
+
+    async def _send_digest(self, owner, channel, digest_key):
+        await asyncio.sleep(DIGEST_WINDOW)
+        requesters = self._digests.pop(digest_key, [])
+        if not requesters:
+            return
+        names = "\n".join(f"• {member.display_name} ({member.mention})" for member in requesters[:20])
+        if len(requesters) > 20:
+            names += f"\n…and {len(requesters) - 20} more"
+        embed = discord.Embed(
+            title=f"🔔 {len(requesters)} more join requests",
+            description=f"More people asked to join **{channel.name}** in **{channel.guild.name}**:\n{names}",
+            color=0x3498db
+        )
+        embed.set_footer(text="Use 🛠️ Manage My Channel → Pending Requests to approve or deny them.")
+        await self.send(owner, embed=embed)
+
+dm_service = DMService()
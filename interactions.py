@@ -0,0 +1,92 @@
+import functools
+
+import discord
+
+# Handlers whose average time-to-ack exceeds this (seconds) are flagged in stats;
+# Discord fails the interaction if it isn't acknowledged within 3 seconds
+SLOW_ACK = 1.5
+
+class InteractionMetrics:
+    """Time-to-ack and time-to-complete per handler, in seconds.
+
+    Times are measured from the interaction's creation (its snowflake
+    timestamp), which is what Discord's 3-second window counts from.
+    """
+
+    def __init__(self):
+        # name -> [count, ack total, ack max, complete total, complete max]
+        self._handlers = {}
+
+    def record(self, name, ack, complete):
+        entry = self._handlers.setdefault(name, [0, 0.0, 0.0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += ack
+        entry[2] = max(entry[2], ack)
+        entry[3] += complete
+        entry[4] = max(entry[4], complete)
+
+    def stats(self):
+        return {
+            name: {
+                "count": count,
+                "avg_ack": ack_total / count,
+                "max_ack": ack_max,
+                "avg_complete": complete_total / count,
+                "max_complete": complete_max,
+            }
+            for name, (count, ack_total, ack_max, complete_total, complete_max) in self._handlers.items()
+        }
+
+interaction_metrics = InteractionMetrics()
+
+def _age(interaction):
+    return max((discord.utils.utcnow() - interaction.created_at).total_seconds(), 0.0)
+
+def ack_first(update=False):
+    """Decorator that defers the interaction before running the handler.
+
+    update=True defers as a message update (the handler edits the message
+    the component is on); otherwise an ephemeral "thinking" reply is
+    deferred. Store and REST work in the handler then runs after the ack,
+    and the handler answers with reply() / edit() below. Works on plain
+    functions and methods; the interaction is found among the arguments.
+    """
+    def decorator(handler):
+        name = handler.__qualname__
+
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            interaction = next(arg for arg in args if isinstance(arg, discord.Interaction))
+            try:
+                if update:
+                    await interaction.response.defer()
+                else:
+                    await interaction.response.defer(ephemeral=True, thinking=True)
+            except discord.NotFound:
+                # Already past the ack window; nothing can be sent back
+                print(f"Interaction for {name} expired before it was acknowledged")
+                return
+            ack = _age(interaction)
+            try:
+                return await handler(*args, **kwargs)
+            except Exception as e:
+                print(f"Error in {name}: {e}")
+                await reply(interaction, "❌ Something went wrong, please try again.", ephemeral=True)
+            finally:
+                interaction_metrics.record(name, ack, _age(interaction))
+        return wrapper
+    return decorator
+
+async def reply(interaction, content=None, **kwargs):
+    """Send a response, or a followup if the interaction was already acknowledged."""
+    if interaction.response.is_done():
+        await interaction.followup.send(content, **kwargs)
+    else:
+        await interaction.response.send_message(content, **kwargs)
+
+async def edit(interaction, **kwargs):
+    """Edit the message the interaction came from, whether or not it was already acknowledged."""
+    if interaction.response.is_done():
+        await interaction.edit_original_response(**kwargs)
+    else:
+        await interaction.response.edit_message(**kwargs)
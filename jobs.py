@@ -0,0 +1,128 @@
+import asyncio
+import json
+import os
+import time
+
+from data import write_json_atomic
+from scheduler import ExpiryScheduler
+
+JOBS_FILE = "jobs.json"
+
+class JobScheduler:
+    """Deferred jobs on a single timer, persisted to JOBS_FILE.
+
+    A job is an action name plus JSON-ready keyword arguments, stored under
+    a key. Scheduling a key that is already pending replaces that job, and
+    cancel() drops it, so e.g. a repeat !voice can supersede a pending menu
+    restore. Handlers are registered per action with register(); jobs that
+    came due while the bot was down run as soon as start() is called.
+
+    Changes are written to JOBS_FILE on a worker thread by a background
+    flush, so schedule() and cancel() never block the event loop; changes
+    made while a write is in flight go out in the next one.
+    """
+
+    def __init__(self, path=JOBS_FILE):
+        self.path = path
+        self.jobs = {}
+        self.handlers = {}
+        self._timer = ExpiryScheduler()
+        self._dirty = False
+        self._flush_task = None
+        self._write_lock = asyncio.Lock()
+
+    def register(self, action, handler):
+        """Run handler(**args) for jobs with this action name."""
+        self.handlers[action] = handler
+
+    def load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    self.jobs = json.load(f)
+            except ValueError as e:
+                print(f"Error loading deferred jobs: {e}")
+                self.jobs = {}
+        for key, job in self.jobs.items():
+            self._timer.schedule(key, job["run_at"])
+
+    def _save(self):
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (e.g. a maintenance script): write right away
+            self._write(self.jobs)
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_loop())
+
+    def _write(self, jobs):
+        try:
+            write_json_atomic(self.path, jobs)
+            return True
+        except OSError as e:
+            print(f"Error saving deferred jobs: {e}")
+            return False
+
+    async def _flush_loop(self):
+        while self._dirty:
+            if not await self.flush():
+                return  # Leave it dirty; the next change retries
+
+    async def flush(self):
+        """Write pending changes now, off the event loop. Returns False if the write failed."""
+        async with self._write_lock:
+            if not self._dirty:
+                return True
+            self._dirty = False
+            # Jobs are replaced, never mutated, so a shallow copy is a stable snapshot
+            if await asyncio.to_thread(self._write, dict(self.jobs)):
+                return True
+            self._dirty = True
+            return False
+
+    def get(self, key):
+        """The pending job under key as {"action", "run_at", "args"}, or None."""
+        return self.jobs.get(key)
+
+    def schedule(self, key, action, delay, **args):
+        """Run action(**args) in delay seconds, replacing any pending job with this key."""
+        run_at = time.time() + delay
+        self.jobs[key] = {"action": action, "run_at": run_at, "args": args}
+        self._timer.schedule(key, run_at)
+        self._save()
+
+    def cancel(self, key):
+        """Drop a pending job. Returns True if there was one."""
+        if self.jobs.pop(key, None) is None:
+            return False
+        self._timer.cancel(key)
+        self._save()
+        return True
+
+    async def _run_due(self, keys):
+        due = [(key, self.jobs.pop(key)) for key in keys if key in self.jobs]
+        if not due:
+            return
+        self._save()
+        for key, job in due:
+            handler = self.handlers.get(job["action"])
+            if handler is None:
+                print(f"No handler for deferred job {key} ({job['action']})")
+                continue
+            try:
+                await handler(**job["args"])
+            except Exception as e:
+                print(f"Deferred job {key} failed: {e}")
+
+    def start(self):
+        self._timer.start(self._run_due)
+
+    def stop(self):
+        self._timer.stop()
+
+    def is_running(self):
+        return self._timer.is_running()
+
+job_scheduler = JobScheduler()
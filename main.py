@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands, tasks
 import asyncio
-import datetime
 import os
 
 # Optional: load from .env if python-dotenv is installed
@@ -19,16 +18,27 @@ if not token:
     exit(1)
 
 # Import our custom modules
-from data import load_settings, save_settings, load_temp_channels, save_temp_channels
+from data import load_settings, save_settings, is_menu_channel, channel_store, settings_cache
+from scheduler import expiry_scheduler
+import teardown
+from rest_queue import rest_queue, USER
+from delete_queue import delete_queue
 from perms import check_text_channel_permissions, format_permission_error
 from setup import setup_echonet, diagnose_permissions
 from menus import (
     MainMenu, 
-    ApproveDenyView, 
     ensure_main_menu, 
     purge_menu_text_channel,
-    MAIN_MENU_TAG
+    menu_channel_is_clean,
+    get_guild_setting,
+    set_guild_setting,
+    restore_main_menu,
+    restore_menu_job_key,
+    channel_list_cache
 )
+from jobs import job_scheduler
+from router import router
+from interactions import interaction_metrics, SLOW_ACK
 
 # Bot setup
 intents = discord.Intents.default()
@@ -38,112 +48,129 @@ intents.message_content = True
 intents.voice_states = True
 intents.members = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
-bot.remove_command("help")
+class EchoNetBot(commands.Bot):
+    async def close(self):
+        expiry_scheduler.stop()
+        job_scheduler.stop()
+        rest_queue.stop()
+        # Write out any channel, job and settings changes still waiting for the next flush
+        await channel_store.flush()
+        await job_scheduler.flush()
+        await settings_cache.flush()
+        await super().close()
 
-temp_channels = {}
+bot = EchoNetBot(command_prefix="!", intents=intents)
+bot.remove_command("help")
 
-def save_data():
-    save_temp_channels(temp_channels)
+# Keep the expiry heap in step with every channel the store loads or changes
+channel_store.subscribe(expiry_scheduler.on_channel_changed)
 
 def load_data():
-    global temp_channels
-    temp_channels = load_temp_channels()
-
-@tasks.loop(minutes=5)
-async def check_expired_channels():
-    now = datetime.datetime.utcnow()
-    to_delete = []
-    for channel_id, info in temp_channels.items():
-        if now >= info["expires_at"]:
-            to_delete.append(channel_id)
-    for channel_id in to_delete:
-        channel = None
-        for guild in bot.guilds:
-            channel = guild.get_channel(channel_id)
-            if channel:
-                break
-        if channel:
-            from perms import check_voice_channel_permissions
-            missing_perms = check_voice_channel_permissions(channel)
-            if not missing_perms:
-                owner = None
-                for guild in bot.guilds:
-                    owner = guild.get_member(temp_channels[channel_id]["owner_id"])
-                    if owner:
-                        break
-                if owner:
-                    try:
-                        await owner.send(f"⏰ Your voice channel **{channel.name}** has expired and been deleted.")
-                    except:
-                        pass
-                try:
-                    await channel.delete(reason="Time limit expired")
-                except:
-                    pass
-            info = temp_channels.get(channel_id)
-            if info and "menu_message_id" in info and "menu_channel_id" in info:
-                menu_channel = bot.get_channel(info["menu_channel_id"])
-                if menu_channel:
-                    try:
-                        menu_msg = await menu_channel.fetch_message(info["menu_message_id"])
-                        await menu_msg.delete()
-                    except Exception:
-                        pass
-        if channel_id in temp_channels:
-            del temp_channels[channel_id]
-    if to_delete:
-        save_data()
+    channel_store.load()
+    load_settings()  # warm the settings cache before messages start arriving
+
+def resolve_guild_id(channel_id):
+    """Find the guild of a channel saved before guild_id was recorded (startup only)."""
+    channel = bot.get_channel(channel_id)
+    return channel.guild.id if channel else None
+
+async def restore_main_menu_job(guild_id, channel_id, message_ids):
+    """Handler for deferred "restore_main_menu" jobs."""
+    guild = bot.get_guild(guild_id)
+    text_channel = guild.get_channel(channel_id) if guild else None
+    if text_channel:
+        await restore_main_menu(text_channel, message_ids)
+
+job_scheduler.register("restore_main_menu", restore_main_menu_job)
+
+async def expire_channels(channel_ids):
+    """Delete channels whose deadline the expiry scheduler reports as passed."""
+    await teardown.expire_channels(bot, channel_ids)
+
+# Menu channels (channel ID -> guild ID) with activity since their last sweep
+dirty_menu_channels = {}
+# How many menu channels are swept at once
+SWEEP_CONCURRENCY = int(os.getenv("ECHONET_SWEEP_CONCURRENCY", "8"))
+
+def mark_menu_channel_dirty(channel_id, guild_id):
+    dirty_menu_channels[channel_id] = guild_id
+
+def mark_all_menu_channels_dirty():
+    """Queue every configured menu channel for a sweep (at startup, when events may have been missed)."""
+    for guild_id, guild_settings in load_settings().items():
+        text_channel_id = guild_settings.get("text_channel_id")
+        if text_channel_id:
+            mark_menu_channel_dirty(text_channel_id, int(guild_id))
+
+async def sweep_menu_channel(channel_id, guild_id):
+    guild = bot.get_guild(guild_id)
+    if not guild:
+        return
+    text_channel = guild.get_channel(channel_id)
+    if not text_channel:
+        return
+    # Anything posted since the menu and the last purge?
+    if not menu_channel_is_clean(text_channel):
+        await purge_menu_text_channel(text_channel)
+        await ensure_main_menu(text_channel)
 
 @tasks.loop(minutes=30)
 async def clean_menu_channels():
-    """Periodically clean menu text channels across all servers."""
-    settings = load_settings()
-    for guild_id, guild_settings in settings.items():
-        try:
-            guild = bot.get_guild(int(guild_id))
-            if not guild:
-                continue
-                
-            text_channel_id = guild_settings.get("text_channel_id")
-            if not text_channel_id:
-                continue
-                
-            text_channel = guild.get_channel(text_channel_id)
-            if not text_channel:
-                continue
-                
-            # Check if there are any non-bot messages or old bot messages
-            should_clean = False
-            async for message in text_channel.history(limit=50):
-                if (not message.pinned and 
-                    (message.author != guild.me or 
-                     not message.content.startswith(MAIN_MENU_TAG))):
-                    should_clean = True
-                    break
-            
-            if should_clean:
-                from menus import purge_menu_text_channel, ensure_main_menu
-                await purge_menu_text_channel(text_channel)
-                await ensure_main_menu(text_channel)
-                
-        except Exception as e:
-            print(f"Error cleaning menu channel for guild {guild_id}: {e}")
+    """Periodically clean the menu text channels that saw activity, a few at a time."""
+    dirty = dict(dirty_menu_channels)
+    dirty_menu_channels.clear()
+    semaphore = asyncio.Semaphore(SWEEP_CONCURRENCY)
+
+    async def sweep(channel_id, guild_id):
+        async with semaphore:
+            try:
+                await sweep_menu_channel(channel_id, guild_id)
+            except Exception as e:
+                mark_menu_channel_dirty(channel_id, guild_id)
+                print(f"Error cleaning menu channel for guild {guild_id}: {e}")
+
+    await asyncio.gather(*(sweep(channel_id, guild_id) for channel_id, guild_id in dirty.items()))
 
 @bot.event
 async def on_ready():
     print(f"✅ Bot logged in as {bot.user}")
-    load_data()
-    check_expired_channels.start()
-    clean_menu_channels.start()
+    # on_ready fires again after reconnects; the store is authoritative once loaded
+    if not channel_store.loaded:
+        load_data()
+    backfilled = await channel_store.backfill_guild_ids(resolve_guild_id)
+    if backfilled:
+        print(f"🔧 Recorded guild IDs for {backfilled} older channels")
+    if not expiry_scheduler.is_running():
+        expiry_scheduler.start(expire_channels)
+    if not job_scheduler.is_running():
+        job_scheduler.load()
+        job_scheduler.start()
+    if not clean_menu_channels.is_running():
+        mark_all_menu_channels_dirty()
+        clean_menu_channels.start()
     bot.add_view(MainMenu())
-    bot.add_view(ApproveDenyView())
     print("🔄 Background tasks started")
-    print(f"📊 Loaded {len(temp_channels)} active channels")
+    print(f"📊 Loaded {len(channel_store)} active channels")
+
+@bot.event
+async def on_guild_available(guild):
+    """Load a guild's channel data once the guild is usable."""
+    await channel_store.load_guild(guild.id)
+
+@bot.event
+async def on_guild_remove(guild):
+    """Drop stored channels for a server the bot was removed from."""
+    channel_store.drop_guild(guild.id)
+
+@bot.event
+async def on_interaction(interaction):
+    """Run routed component clicks (management buttons, channel list, ...)."""
+    await router.dispatch(interaction)
 
 @bot.event
 async def on_guild_join(guild):
     """Send welcome message when bot joins a new server."""
+    await channel_store.load_guild(guild.id)
     # Find a channel where the bot can send messages
     channel = None
     
@@ -200,24 +227,44 @@ async def on_message(message):
     """Handle messages and keep menu channels clean."""
     # Process commands first
     await bot.process_commands(message)
-    
+
+    in_menu_channel = message.guild is not None and is_menu_channel(message.channel.id)
+    if in_menu_channel:
+        mark_menu_channel_dirty(message.channel.id, message.guild.id)
+
     # Don't process bot's own messages
     if message.author == bot.user:
         return
         
     # Check if this message is in a menu text channel
-    settings = load_settings()
-    guild_id = str(message.guild.id) if message.guild else None
-    
-    if guild_id and guild_id in settings:
-        text_channel_id = settings[guild_id].get("text_channel_id")
-        if text_channel_id == message.channel.id:
-            # This is a menu channel, delete the user's message after a short delay
-            try:
-                await asyncio.sleep(2)  # Give users a moment to see their message was received
-                await message.delete()
-            except:
-                pass  # Ignore if we can't delete (permissions, message already deleted, etc.)
+    if in_menu_channel:
+        # This is a menu channel; the user's message is deleted with the
+        # channel's next batch, after a short delay so they see it arrived
+        delete_queue.add(message)
+
+@bot.event
+async def on_voice_state_update(member, before, after):
+    """Member counts are part of the cached channel list pages."""
+    for channel in (before.channel, after.channel):
+        if channel is not None and channel.id in channel_store:
+            channel_list_cache.invalidate(member.guild.id)
+            return
+
+@bot.event
+async def on_guild_channel_update(before, after):
+    """Renamed temp channels show up under the new name in the channel list."""
+    if after.id in channel_store:
+        channel_list_cache.invalidate(after.guild.id)
+
+@bot.event
+async def on_raw_message_delete(payload):
+    """A deleted main menu has to be re-sent on the next sweep."""
+    if payload.guild_id and is_menu_channel(payload.channel_id):
+        guild = bot.get_guild(payload.guild_id)
+        if guild and payload.message_id == get_guild_setting(guild, "main_menu_message_id"):
+            # Without a stored menu ID the channel no longer counts as clean
+            set_guild_setting(guild, "main_menu_message_id", None)
+            mark_menu_channel_dirty(payload.channel_id, payload.guild_id)
 
 @bot.event
 async def on_command_error(ctx, error):
@@ -247,8 +294,10 @@ async def voice_command(ctx):
         perm_error = format_permission_error(missing_perms, f"Text Channel {menu_text_channel.name}")
         await ctx.send(f"❌ Cannot set up menu due to missing permissions:\\n{perm_error}\\n\\nPlease grant these permissions and try again.")
         return
-    await purge_menu_text_channel(menu_text_channel)
-    await ensure_main_menu(menu_text_channel)
+    # This refresh supersedes any restore still pending for the channel
+    job_scheduler.cancel(restore_menu_job_key(menu_text_channel))
+    await purge_menu_text_channel(menu_text_channel, USER)
+    await ensure_main_menu(menu_text_channel, USER)
 
 @bot.command(name="echonetsetup")
 @commands.has_permissions(manage_channels=True)
@@ -263,24 +312,44 @@ async def echonetdiagnose_command(ctx):
 @bot.command(name="echonetstats")
 @commands.has_permissions(manage_channels=True)
 async def echonetstats_command(ctx):
-    guild_channels = [cid for cid, info in temp_channels.items() 
-                     if ctx.guild.get_channel(cid) is not None]
+    guild_channels = [cid for cid, info in channel_store.in_guild(ctx.guild.id)
+                      if ctx.guild.get_channel(cid) is not None]
     embed = discord.Embed(
         title="📊 EchoNet Statistics",
         color=0x00ff00
     )
     embed.add_field(name="Active Channels (This Server)", value=str(len(guild_channels)), inline=True)
-    embed.add_field(name="Total Active Channels", value=str(len(temp_channels)), inline=True)
+    embed.add_field(name="Total Active Channels", value=str(len(channel_store)), inline=True)
     embed.add_field(name="Servers Using EchoNet", value=str(len(bot.guilds)), inline=True)
+    queue_stats = rest_queue.stats()
+    embed.add_field(
+        name="REST Queue",
+        value="\n".join(
+            f"{name}: {s['queued']} queued, avg wait {s['avg_wait']:.2f}s"
+            for name, s in queue_stats.items()
+        ),
+        inline=False
+    )
+    handler_stats = sorted(interaction_metrics.stats().items(), key=lambda item: item[1]["avg_ack"], reverse=True)
+    if handler_stats:
+        embed.add_field(
+            name="Interaction Handlers (slowest ack first)",
+            value="\n".join(
+                f"{'⚠️ ' if s['avg_ack'] > SLOW_ACK else ''}{name}: ack {s['avg_ack']:.2f}s (max {s['max_ack']:.2f}s), "
+                f"done {s['avg_complete']:.2f}s over {s['count']}"
+                for name, s in handler_stats[:8]
+            ),
+            inline=False
+        )
     if guild_channels:
         channel_info = []
         for cid in guild_channels[:5]:
             channel = ctx.guild.get_channel(cid)
             if channel:
-                info = temp_channels[cid]
-                owner = ctx.guild.get_member(info["owner_id"])
+                info = channel_store.get(cid)
+                owner = ctx.guild.get_member(info.owner_id)
                 owner_name = owner.display_name if owner else "Unknown"
-                expires = info["expires_at"].strftime("%Y-%m-%d %H:%M UTC")
+                expires = info.expires_datetime.strftime("%Y-%m-%d %H:%M UTC")
                 channel_info.append(f"**{channel.name}** - {owner_name} (expires {expires})")
         if channel_info:
             embed.add_field(
@@ -455,6 +524,7 @@ if __name__ == "__main__":
     print("🚀 Starting EchoNet Discord bot...")
     try:
         bot.run(token)
+        channel_store.flush_sync()
     except Exception as e:
         print(f"❌ Bot failed to start: {e}")
         raise
@@ -2,8 +2,14 @@ import discord
 from discord.ext import commands
 import asyncio
 import datetime
-from data import load_settings, save_settings, load_temp_channels, save_temp_channels
+from data import load_settings, save_settings, save_settings_later, channel_store, epoch_now, TempChannel
 from perms import check_category_permissions, check_voice_channel_permissions, format_permission_error
+from rest_queue import rest_queue, USER, MAINTENANCE
+from dm_service import dm_service
+from overwrites import overwrite_manager
+from jobs import job_scheduler
+from router import router
+from interactions import ack_first, reply, edit
 
 MAIN_MENU_TAG = "🎤 **MAIN MENU**"
 
@@ -39,10 +45,7 @@ class MainMenu(discord.ui.View):
 
     @discord.ui.button(label="🛠️ Manage My Channel", style=discord.ButtonStyle.blurple, custom_id="mainmenu_manage")
     async def manage_channel(self, interaction, button):
-        from data import load_temp_channels
-        temp_channels = load_temp_channels()
-
-        owned = [cid for cid, info in temp_channels.items() if info["owner_id"] == interaction.user.id]
+        owned = channel_store.owned_by(interaction.user.id, interaction.guild.id)
         if not owned:
             await interaction.response.send_message("❌ You don't own any active voice channels.", ephemeral=True)
             return
@@ -58,7 +61,7 @@ class MainMenu(discord.ui.View):
                 description="Use the buttons below to manage your channel.",
                 color=0x00ff00
             )
-            view = ChannelManagementView(cid)
+            view = channel_management_view(cid)
             await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
         else:
             embed = discord.Embed(title="Select a Channel to Manage", color=0x00ff00)
@@ -73,13 +76,12 @@ class MainMenu(discord.ui.View):
                 await interaction.response.send_message("❌ None of your channels were found!", ephemeral=True)
                 return
 
-            view = SelectChannelView(interaction.user.id, channel_options)
+            view = channel_select_view(channel_options)
             await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
 
     @discord.ui.button(label="📋 List Channels", style=discord.ButtonStyle.primary, custom_id="mainmenu_list")
     async def list_channels(self, interaction, button):
-        view = ListChannelsView(interaction.user.id, interaction.guild)
-        await view.send_channel_list(interaction)
+        await send_channel_list(interaction)
 
     @discord.ui.button(label="❓ Help", style=discord.ButtonStyle.secondary, custom_id="mainmenu_help")
     async def show_help(self, interaction, button):
@@ -252,6 +254,7 @@ class CreateChannelView(discord.ui.View):
 
         await interaction.edit_original_response(embed=embed, view=self)
 
+    @ack_first(update=True)
     async def create_channel(self, interaction: discord.Interaction):
         settings = load_settings()
         guild_id = str(interaction.guild.id)
@@ -273,27 +276,22 @@ class CreateChannelView(discord.ui.View):
             else:
                 overwrites[interaction.guild.default_role] = discord.PermissionOverwrite(connect=True, view_channel=True)
 
-            channel = await category.create_voice_channel(
+            channel = await rest_queue.submit(category.create_voice_channel(
                 name=self.channel_name,
                 overwrites=overwrites,
                 reason=f"Temporary channel created by {interaction.user}"
-            )
+            ), USER, "channel_create", interaction.guild.id)
 
             # Calculate expiration
-            expires_at = datetime.datetime.utcnow() + datetime.timedelta(days=self.duration_days)
+            expires_at = epoch_now() + self.duration_days * 86400
 
             # Save channel data
-            temp_channels = load_temp_channels()
-            temp_channels[channel.id] = {
-                "owner_id": interaction.user.id,
-                "expires_at": expires_at,
-                "request_only": self.request_only,
-                "pending_requests": [],
-                "menu_message_id": None,
-                "menu_channel_id": None,
-                "blocked_users": []
-            }
-            save_temp_channels(temp_channels)
+            channel_store.add(channel.id, TempChannel(
+                owner_id=interaction.user.id,
+                guild_id=interaction.guild.id,
+                expires_at=expires_at,
+                request_only=self.request_only
+            ))
 
             # Create management embed
             embed = discord.Embed(
@@ -303,277 +301,280 @@ class CreateChannelView(discord.ui.View):
             )
             embed.add_field(name="Duration", value=f"{self.duration_days} days", inline=True)
             embed.add_field(name="Access", value="Request Only" if self.request_only else "Open", inline=True)
-            embed.add_field(name="Expires", value=f"<t:{int(expires_at.timestamp())}:R>", inline=True)
+            embed.add_field(name="Expires", value=f"<t:{expires_at}:R>", inline=True)
 
-            view = ChannelManagementView(channel.id)
-            await interaction.response.edit_message(embed=embed, view=view)
+            view = channel_management_view(channel.id)
+            await edit(interaction, embed=embed, view=view)
 
         except discord.Forbidden:
-            await interaction.response.send_message("❌ I don't have permission to create voice channels.", ephemeral=True)
+            await reply(interaction, "❌ I don't have permission to create voice channels.", ephemeral=True)
         except Exception as e:
-            await interaction.response.send_message(f"❌ Error creating channel: {str(e)}", ephemeral=True)
-
-class SelectChannelView(discord.ui.View):
-    def __init__(self, user_id, channel_options):
-        super().__init__(timeout=60)
-        self.user_id = user_id
-        self.channel_options = channel_options
-
-        options = []
-        for name, cid in channel_options[:25]:
-            options.append(discord.SelectOption(label=name, value=str(cid)))
-
-        select = discord.ui.Select(placeholder="Choose a channel to manage...", options=options)
-        select.callback = self.select_callback
-        self.add_item(select)
-
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        return interaction.user.id == self.user_id
-
-    async def select_callback(self, interaction: discord.Interaction):
-        cid = int(interaction.data['values'][0])
-        channel = interaction.guild.get_channel(cid)
-        if not channel:
-            await interaction.response.send_message("❌ Channel not found!", ephemeral=True)
-            return
-
-        embed = discord.Embed(
-            title=f"Manage Channel: {channel.name}",
-            description="Use the buttons below to manage your channel.",
-            color=0x00ff00
-        )
-        view = ChannelManagementView(cid)
-        await interaction.response.edit_message(embed=embed, view=view)
-
-class ChannelManagementView(discord.ui.View):
-    def __init__(self, channel_id):
-        super().__init__(timeout=300)
-        self.channel_id = channel_id
-
-    @discord.ui.button(label="Transfer Ownership", style=discord.ButtonStyle.blurple, emoji="👑", row=0)
-    async def transfer_ownership(self, interaction: discord.Interaction, button: discord.ui.Button):
-        from data import load_temp_channels
-        temp_channels = load_temp_channels()
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
-            return
-
-        if temp_channels[self.channel_id]["owner_id"] != interaction.user.id:
-            await interaction.response.send_message("❌ Only the channel owner can transfer ownership.", ephemeral=True)
-            return
-
-        modal = TransferOwnershipModal(self.channel_id)
-        await interaction.response.send_modal(modal)
-
-    @discord.ui.button(label="Invite User", style=discord.ButtonStyle.green, emoji="📨", row=0)
-    async def invite_user(self, interaction: discord.Interaction, button: discord.ui.Button):
-        from data import load_temp_channels
-        temp_channels = load_temp_channels()
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
-            return
-
-        if temp_channels[self.channel_id]["owner_id"] != interaction.user.id:
-            await interaction.response.send_message("❌ Only the channel owner can invite users.", ephemeral=True)
-            return
-
-        modal = InviteUserModal(self.channel_id)
-        await interaction.response.send_modal(modal)
-
-    @discord.ui.button(label="Kick User", style=discord.ButtonStyle.red, emoji="👢", row=0)
-    async def kick_user(self, interaction: discord.Interaction, button: discord.ui.Button):
-        from data import load_temp_channels
-        temp_channels = load_temp_channels()
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
-            return
-
-        if temp_channels[self.channel_id]["owner_id"] != interaction.user.id:
-            await interaction.response.send_message("❌ Only the channel owner can kick users.", ephemeral=True)
-            return
-
-        view = KickUserView(self.channel_id, interaction.user.id)
-        await interaction.response.send_message("Select a user to kick:", view=view, ephemeral=True)
-
-    @discord.ui.button(label="Channel Stats", style=discord.ButtonStyle.secondary, emoji="📊", row=0)
-    async def channel_stats(self, interaction: discord.Interaction, button: discord.ui.Button):
-        from data import load_temp_channels
-        temp_channels = load_temp_channels()
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
-            return
-
-        info = temp_channels[self.channel_id]
-        channel = interaction.guild.get_channel(self.channel_id)
-        if not channel:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
-            return
-
-        owner = interaction.guild.get_member(info["owner_id"])
-        created_time = info["expires_at"] - datetime.timedelta(days=30)  # Estimate based on max duration
-
-        embed = discord.Embed(
-            title=f"📊 Channel Statistics: {channel.name}",
-            color=0x3498db
-        )
-        embed.add_field(name="Owner", value=owner.mention if owner else "Unknown", inline=True)
-        embed.add_field(name="Current Members", value=str(len(channel.members)), inline=True)
-        embed.add_field(name="Access Type", value="🔒 Request Only" if info.get("request_only") else "🌐 Open", inline=True)
-        embed.add_field(name="Expires", value=f"<t:{int(info['expires_at'].timestamp())}:R>", inline=True)
-        embed.add_field(name="Pending Requests", value=str(len(info.get("pending_requests", []))), inline=True)
-        embed.add_field(name="Blocked Users", value=str(len(info.get("blocked_users", []))), inline=True)
-        embed.add_field(name="User Limit", value=str(info.get("user_limit", "No limit")), inline=True)
-
-        await interaction.response.send_message(embed=embed, ephemeral=True)
-
-    @discord.ui.button(label="Extend Duration", style=discord.ButtonStyle.primary, emoji="⏰", row=1)
-    async def extend_duration(self, interaction: discord.Interaction, button: discord.ui.Button):
-        from data import load_temp_channels
-        temp_channels = load_temp_channels()
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
-            return
-
-        if temp_channels[self.channel_id]["owner_id"] != interaction.user.id:
-            await interaction.response.send_message("❌ Only the channel owner can extend duration.", ephemeral=True)
-            return
-
-        view = ExtendDurationView(self.channel_id, interaction.user.id)
-        await interaction.response.send_message("Choose how much to extend the channel duration:", view=view, ephemeral=True)
-
-    @discord.ui.button(label="Change Access Type", style=discord.ButtonStyle.secondary, emoji="🔄", row=1)
-    async def change_access_type(self, interaction: discord.Interaction, button: discord.ui.Button):
-        from data import load_temp_channels, save_temp_channels
-        temp_channels = load_temp_channels()
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
-            return
-
-        if temp_channels[self.channel_id]["owner_id"] != interaction.user.id:
-            await interaction.response.send_message("❌ Only the channel owner can change access type.", ephemeral=True)
-            return
-
-        info = temp_channels[self.channel_id]
-        current_type = info.get("request_only", False)
-        new_type = not current_type
-        info["request_only"] = new_type
-        save_temp_channels(temp_channels)
-
-        # Update channel permissions
-        channel = interaction.guild.get_channel(self.channel_id)
-        if channel:
-            overwrites = channel.overwrites
-            if new_type:  # Changing to request only
-                overwrites[interaction.guild.default_role] = discord.PermissionOverwrite(connect=False, view_channel=True)
-            else:  # Changing to open
-                overwrites[interaction.guild.default_role] = discord.PermissionOverwrite(connect=True, view_channel=True)
-
-            try:
-                await channel.edit(overwrites=overwrites, reason="Access type changed by owner")
-                access_text = "🔒 Request Only" if new_type else "🌐 Open"
-                await interaction.response.send_message(f"✅ Channel access type changed to **{access_text}**!", ephemeral=True)
-            except discord.Forbidden:
-                await interaction.response.send_message("❌ I don't have permission to edit the channel.", ephemeral=True)
-
-    @discord.ui.button(label="Set User Limit", style=discord.ButtonStyle.secondary, emoji="👥", row=1)
-    async def set_user_limit(self, interaction: discord.Interaction, button: discord.ui.Button):
-        from data import load_temp_channels
-        temp_channels = load_temp_channels()
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
-            return
-
-        if temp_channels[self.channel_id]["owner_id"] != interaction.user.id:
-            await interaction.response.send_message("❌ Only the channel owner can set user limit.", ephemeral=True)
-            return
-
-        modal = SetUserLimitModal(self.channel_id)
-        await interaction.response.send_modal(modal)
-
-    @discord.ui.button(label="View Pending Requests", style=discord.ButtonStyle.primary, emoji="📋", row=1)
-    async def view_pending_requests(self, interaction: discord.Interaction, button: discord.ui.Button):
-        from data import load_temp_channels
-        temp_channels = load_temp_channels()
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
-            return
-
-        if temp_channels[self.channel_id]["owner_id"] != interaction.user.id:
-            await interaction.response.send_message("❌ Only the channel owner can view pending requests.", ephemeral=True)
-            return
-
-        info = temp_channels[self.channel_id]
-        pending = info.get("pending_requests", [])
-
-        if not pending:
-            await interaction.response.send_message("❌ No pending requests for this channel.", ephemeral=True)
-            return
+            await reply(interaction, f"❌ Error creating channel: {str(e)}", ephemeral=True)
+
+def channel_select_view(channel_options):
+    """Picker for owners of several channels; the choice is routed to manage_select."""
+    options = []
+    for name, cid in channel_options[:25]:
+        options.append(discord.SelectOption(label=name, value=str(cid)))
+
+    return router.view(router.select("manage_select", 0, placeholder="Choose a channel to manage...", options=options))
+
+@router.route("manage_select")
+async def manage_select(interaction: discord.Interaction, _):
+    cid = int(interaction.data['values'][0])
+    info = channel_store.get(cid)
+    channel = interaction.guild.get_channel(cid)
+    if not channel or info is None or info.owner_id != interaction.user.id:
+        await interaction.response.send_message("❌ Channel not found!", ephemeral=True)
+        return
+
+    embed = discord.Embed(
+        title=f"Manage Channel: {channel.name}",
+        description="Use the buttons below to manage your channel.",
+        color=0x00ff00
+    )
+    await interaction.response.edit_message(embed=embed, view=channel_management_view(cid))
+
+def channel_management_view(channel_id):
+    """Owner controls for a channel; clicks are routed by custom_id (see router.py)."""
+    return router.view(
+        router.button("transfer_ownership", channel_id, label="Transfer Ownership", style=discord.ButtonStyle.blurple, emoji="👑", row=0),
+        router.button("invite_user", channel_id, label="Invite User", style=discord.ButtonStyle.green, emoji="📨", row=0),
+        router.button("kick_user", channel_id, label="Kick User", style=discord.ButtonStyle.red, emoji="👢", row=0),
+        router.button("channel_stats", channel_id, label="Channel Stats", style=discord.ButtonStyle.secondary, emoji="📊", row=0),
+        router.button("extend_duration", channel_id, label="Extend Duration", style=discord.ButtonStyle.primary, emoji="⏰", row=1),
+        router.button("change_access_type", channel_id, label="Change Access Type", style=discord.ButtonStyle.secondary, emoji="🔄", row=1),
+        router.button("set_user_limit", channel_id, label="Set User Limit", style=discord.ButtonStyle.secondary, emoji="👥", row=1),
+        router.button("view_pending_requests", channel_id, label="View Pending Requests", style=discord.ButtonStyle.primary, emoji="📋", row=1),
+        router.button("block_user", channel_id, label="Block User", style=discord.ButtonStyle.secondary, emoji="🚫", row=2),
+        router.button("edit_channel", channel_id, label="Edit Channel", style=discord.ButtonStyle.primary, emoji="✏️", row=2),
+        router.button("unblock_users", channel_id, label="Unblock Users", style=discord.ButtonStyle.success, emoji="✅", row=2),
+        router.button("delete_channel", channel_id, label="Delete Channel", style=discord.ButtonStyle.red, emoji="🗑️", row=2),
+    )
+
+@router.route("transfer_ownership")
+async def transfer_ownership(interaction: discord.Interaction, channel_id):
+    info = channel_store.get(channel_id)
+    if info is None:
+        await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
+        return
+
+    if info.owner_id != interaction.user.id:
+        await interaction.response.send_message("❌ Only the channel owner can transfer ownership.", ephemeral=True)
+        return
+
+    modal = TransferOwnershipModal(channel_id)
+    await interaction.response.send_modal(modal)
+
+@router.route("invite_user")
+async def invite_user(interaction: discord.Interaction, channel_id):
+    info = channel_store.get(channel_id)
+    if info is None:
+        await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
+        return
+
+    if info.owner_id != interaction.user.id:
+        await interaction.response.send_message("❌ Only the channel owner can invite users.", ephemeral=True)
+        return
+
+    modal = InviteUserModal(channel_id)
+    await interaction.response.send_modal(modal)
+
+@router.route("kick_user")
+async def kick_user(interaction: discord.Interaction, channel_id):
+    info = channel_store.get(channel_id)
+    if info is None:
+        await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
+        return
+
+    if info.owner_id != interaction.user.id:
+        await interaction.response.send_message("❌ Only the channel owner can kick users.", ephemeral=True)
+        return
+
+    view = router.view(router.button("kick_select", channel_id, label="Select User to Kick", style=discord.ButtonStyle.red, emoji="👢"))
+    await interaction.response.send_message("Select a user to kick:", view=view, ephemeral=True)
+
+@router.route("channel_stats")
+async def channel_stats(interaction: discord.Interaction, channel_id):
+    info = channel_store.get(channel_id)
+    if info is None:
+        await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
+        return
+
+    channel = interaction.guild.get_channel(channel_id)
+    if not channel:
+        await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
+        return
+
+    owner = interaction.guild.get_member(info.owner_id)
+
+    embed = discord.Embed(
+        title=f"📊 Channel Statistics: {channel.name}",
+        color=0x3498db
+    )
+    embed.add_field(name="Owner", value=owner.mention if owner else "Unknown", inline=True)
+    embed.add_field(name="Current Members", value=str(len(channel.members)), inline=True)
+    embed.add_field(name="Access Type", value="🔒 Request Only" if info.request_only else "🌐 Open", inline=True)
+    embed.add_field(name="Expires", value=f"<t:{info.expires_at}:R>", inline=True)
+    embed.add_field(name="Pending Requests", value=str(len(info.pending_requests)), inline=True)
+    embed.add_field(name="Blocked Users", value=str(len(info.blocked_users)), inline=True)
+    embed.add_field(name="User Limit", value=str(info.user_limit or "No limit"), inline=True)
+
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@router.route("extend_duration")
+async def extend_duration(interaction: discord.Interaction, channel_id):
+    info = channel_store.get(channel_id)
+    if info is None:
+        await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
+        return
+
+    if info.owner_id != interaction.user.id:
+        await interaction.response.send_message("❌ Only the channel owner can extend duration.", ephemeral=True)
+        return
+
+    view = router.view(*(
+        router.button("extend", channel_id, hours, label=label, style=discord.ButtonStyle.secondary, emoji=emoji)
+        for label, hours, emoji in EXTEND_OPTIONS
+    ))
+    await interaction.response.send_message("Choose how much to extend the channel duration:", view=view, ephemeral=True)
+
+@router.route("change_access_type")
+@ack_first()
+async def change_access_type(interaction: discord.Interaction, channel_id):
+    info = channel_store.get(channel_id)
+    if info is None:
+        await reply(interaction, "❌ Channel not found.", ephemeral=True)
+        return
+
+    if info.owner_id != interaction.user.id:
+        await reply(interaction, "❌ Only the channel owner can change access type.", ephemeral=True)
+        return
+
+    new_type = not info.request_only
+    info.request_only = new_type
+    channel_store.save(channel_id, "access")
+
+    # Update channel permissions
+    channel = interaction.guild.get_channel(channel_id)
+    if channel:
+        # Request only: everyone can see the channel but not connect
+        overwrite = discord.PermissionOverwrite(connect=not new_type, view_channel=True)
 
-        embed = discord.Embed(
-            title="📋 Pending Join Requests",
-            color=0x3498db
-        )
-
-        for user_id in pending:
-            user = interaction.guild.get_member(user_id)
-            if user:
-                embed.add_field(
-                    name=user.display_name,
-                    value=user.mention,
-                    inline=True
-                )
-
-        view = ManagePendingRequestsView(self.channel_id, interaction.user.id, pending)
-        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
-
-    @discord.ui.button(label="Block User", style=discord.ButtonStyle.secondary, emoji="🚫", row=2)
-    async def block_user(self, interaction: discord.Interaction, button: discord.ui.Button):
-        from data import load_temp_channels
-        temp_channels = load_temp_channels()
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
-            return
-
-        if temp_channels[self.channel_id]["owner_id"] != interaction.user.id:
-            await interaction.response.send_message("❌ Only the channel owner can block users.", ephemeral=True)
-            return
-
-        modal = BlockUserModal(self.channel_id)
-        await interaction.response.send_modal(modal)
-
-    @discord.ui.button(label="Edit Channel", style=discord.ButtonStyle.primary, emoji="✏️", row=2)
-    async def edit_channel(self, interaction: discord.Interaction, button: discord.ui.Button):
-        view = EditChannelView(self.channel_id, interaction.user.id)
-        await interaction.response.send_message("Edit your channel settings below:", view=view, ephemeral=True)
-
-    @discord.ui.button(label="Unblock Users", style=discord.ButtonStyle.success, emoji="✅", row=2)
-    async def unblock_users(self, interaction: discord.Interaction, button: discord.ui.Button):
-        view = UnblockedUsersView(self.channel_id, interaction.user.id)
-        await interaction.response.send_message("Manage your blocked users below:", view=view, ephemeral=True)
-
-    @discord.ui.button(label="Delete Channel", style=discord.ButtonStyle.red, emoji="🗑️", row=2)
-    async def delete_channel(self, interaction: discord.Interaction, button: discord.ui.Button):
-        from data import load_temp_channels, save_temp_channels
-        temp_channels = load_temp_channels()
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
-            return
-
-        if temp_channels[self.channel_id]["owner_id"] != interaction.user.id:
-            await interaction.response.send_message("❌ Only the channel owner can delete it.", ephemeral=True)
-            return
+        try:
+            await overwrite_manager.update(channel, interaction.guild.default_role, overwrite, reason="Access type changed by owner")
+            access_text = "🔒 Request Only" if new_type else "🌐 Open"
+            await reply(interaction, f"✅ Channel access type changed to **{access_text}**!", ephemeral=True)
+        except discord.Forbidden:
+            await reply(interaction, "❌ I don't have permission to edit the channel.", ephemeral=True)
+
+@router.route("set_user_limit")
+async def set_user_limit(interaction: discord.Interaction, channel_id):
+    info = channel_store.get(channel_id)
+    if info is None:
+        await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
+        return
+
+    if info.owner_id != interaction.user.id:
+        await interaction.response.send_message("❌ Only the channel owner can set user limit.", ephemeral=True)
+        return
+
+    modal = SetUserLimitModal(channel_id)
+    await interaction.response.send_modal(modal)
+
+@router.route("view_pending_requests")
+async def view_pending_requests(interaction: discord.Interaction, channel_id):
+    info = channel_store.get(channel_id)
+    if info is None:
+        await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
+        return
+
+    if info.owner_id != interaction.user.id:
+        await interaction.response.send_message("❌ Only the channel owner can view pending requests.", ephemeral=True)
+        return
+
+    pending = list(info.pending_requests)
+
+    if not pending:
+        await interaction.response.send_message("❌ No pending requests for this channel.", ephemeral=True)
+        return
+
+    embed = discord.Embed(
+        title="📋 Pending Join Requests",
+        color=0x3498db
+    )
+    if len(pending) > 25:
+        # Embeds hold at most 25 fields; Approve All / Deny All cover the rest
+        embed.description = f"{len(pending)} requests; showing the first 25."
+
+    for user_id in pending[:25]:
+        user = interaction.guild.get_member(user_id)
+        if user:
+            embed.add_field(
+                name=user.display_name,
+                value=user.mention,
+                inline=True
+            )
 
-        channel = interaction.guild.get_channel(self.channel_id)
-        if channel:
-            try:
-                await channel.delete(reason=f"Deleted by owner {interaction.user}")
-                del temp_channels[self.channel_id]
-                save_temp_channels(temp_channels)
-                await interaction.response.send_message("✅ Channel deleted successfully.", ephemeral=True)
-            except discord.Forbidden:
-                await interaction.response.send_message("❌ I don't have permission to delete the channel.", ephemeral=True)
-        else:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
+    view = ManagePendingRequestsView(channel_id, interaction.user.id, pending)
+    await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+
+@router.route("block_user")
+async def block_user(interaction: discord.Interaction, channel_id):
+    info = channel_store.get(channel_id)
+    if info is None:
+        await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
+        return
+
+    if info.owner_id != interaction.user.id:
+        await interaction.response.send_message("❌ Only the channel owner can block users.", ephemeral=True)
+        return
+
+    modal = BlockUserModal(channel_id)
+    await interaction.response.send_modal(modal)
+
+@router.route("edit_channel")
+async def edit_channel(interaction: discord.Interaction, channel_id):
+    info = channel_store.get(channel_id)
+    if info is None or info.owner_id != interaction.user.id:
+        await interaction.response.send_message("❌ Only the channel owner can edit it.", ephemeral=True)
+        return
+
+    view = EditChannelView(channel_id, interaction.user.id)
+    await interaction.response.send_message("Edit your channel settings below:", view=view, ephemeral=True)
+
+@router.route("unblock_users")
+async def unblock_users(interaction: discord.Interaction, channel_id):
+    info = channel_store.get(channel_id)
+    if info is None or info.owner_id != interaction.user.id:
+        await interaction.response.send_message("❌ Only the channel owner can unblock users.", ephemeral=True)
+        return
+
+    view = UnblockedUsersView(channel_id, interaction.user.id)
+    await interaction.response.send_message("Manage your blocked users below:", view=view, ephemeral=True)
+
+@router.route("delete_channel")
+@ack_first()
+async def delete_channel(interaction: discord.Interaction, channel_id):
+    info = channel_store.get(channel_id)
+    if info is None:
+        await reply(interaction, "❌ Channel not found.", ephemeral=True)
+        return
+
+    if info.owner_id != interaction.user.id:
+        await reply(interaction, "❌ Only the channel owner can delete it.", ephemeral=True)
+        return
+
+    channel = interaction.guild.get_channel(channel_id)
+    if channel:
+        try:
+            await rest_queue.submit(channel.delete(reason=f"Deleted by owner {interaction.user}"), USER, "channel_delete", channel.id)
+            channel_store.remove(channel_id)
+            await reply(interaction, "✅ Channel deleted successfully.", ephemeral=True)
+        except discord.Forbidden:
+            await reply(interaction, "❌ I don't have permission to delete the channel.", ephemeral=True)
+    else:
+        await reply(interaction, "❌ Channel not found.", ephemeral=True)
 
 class EditChannelView(discord.ui.View):
     def __init__(self, channel_id, user_id):
@@ -584,8 +585,17 @@ class EditChannelView(discord.ui.View):
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         return interaction.user.id == self.user_id
 
+    def is_owner(self, user_id):
+        """Checked against the store on every click; ownership may have been transferred since."""
+        info = channel_store.get(self.channel_id)
+        return info is not None and info.owner_id == user_id
+
     @discord.ui.button(label="Rename Channel", style=discord.ButtonStyle.primary, emoji="✏️")
     async def rename_channel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if not self.is_owner(interaction.user.id):
+            await interaction.response.send_message("❌ Only the channel owner can rename it.", ephemeral=True)
+            return
+
         await interaction.response.send_message("Please type the new name for your channel (1-100 characters):", ephemeral=True)
 
         def check(m):
@@ -599,19 +609,20 @@ class EditChannelView(discord.ui.View):
                 return
 
             channel = interaction.guild.get_channel(self.channel_id)
-            if not channel:
+            if not channel or not self.is_owner(interaction.user.id):
                 await interaction.followup.send("❌ Channel not found!", ephemeral=True)
                 return
 
-            await channel.edit(name=new_name, reason="Renamed by owner via EchoNet")
+            await rest_queue.submit(channel.edit(name=new_name, reason="Renamed by owner via EchoNet"), USER, "channel_edit", channel.id)
             await interaction.followup.send(f"✅ Channel renamed to **{new_name}**!", ephemeral=True)
         except asyncio.TimeoutError:
             await interaction.followup.send("⏰ Timed out! Please try again.", ephemeral=True)
 
     @discord.ui.button(label="Change Duration", style=discord.ButtonStyle.secondary, emoji="⏰")
     async def change_duration(self, interaction: discord.Interaction, button: discord.ui.Button):
-        from data import load_temp_channels, save_temp_channels
-        temp_channels = load_temp_channels()
+        if not self.is_owner(interaction.user.id):
+            await interaction.response.send_message("❌ Only the channel owner can change its duration.", ephemeral=True)
+            return
 
         await interaction.response.send_message("Please type the new duration in days (1-60):", ephemeral=True)
 
@@ -626,13 +637,13 @@ class EditChannelView(discord.ui.View):
                     await interaction.followup.send("❌ Please enter a number between 1 and 60!", ephemeral=True)
                     return
 
-                if self.channel_id not in temp_channels:
+                info = channel_store.get(self.channel_id)
+                if info is None or info.owner_id != interaction.user.id:
                     await interaction.followup.send("❌ Channel not found in data!", ephemeral=True)
                     return
 
-                expires_at = datetime.datetime.utcnow() + datetime.timedelta(days=days)
-                temp_channels[self.channel_id]["expires_at"] = expires_at
-                save_temp_channels(temp_channels)
+                info.expires_at = epoch_now() + days * 86400
+                channel_store.save(self.channel_id, "extend")
                 await interaction.followup.send(f"✅ Channel duration updated to {days} day(s) from now.", ephemeral=True)
             except ValueError:
                 await interaction.followup.send("❌ Please enter a valid number!", ephemeral=True)
@@ -650,14 +661,16 @@ class UnblockedUsersView(discord.ui.View):
 
     @discord.ui.button(label="Unblock a User", style=discord.ButtonStyle.success, emoji="✅")
     async def unblock_user(self, interaction: discord.Interaction, button: discord.ui.Button):
-        from data import load_temp_channels, save_temp_channels
-        temp_channels = load_temp_channels()
+        info = channel_store.get(self.channel_id)
+        if info is not None and info.owner_id != interaction.user.id:
+            await interaction.response.send_message("❌ Only the channel owner can unblock users.", ephemeral=True)
+            return
 
-        if self.channel_id not in temp_channels or not temp_channels[self.channel_id]["blocked_users"]:
+        if info is None or not info.blocked_users:
             await interaction.response.send_message("❌ No blocked users for this channel.", ephemeral=True)
             return
 
-        blocked_ids = temp_channels[self.channel_id]["blocked_users"]
+        blocked_ids = info.blocked_users
         guild = interaction.guild
         blocked_members = [guild.get_member(uid) for uid in blocked_ids if guild.get_member(uid)]
 
@@ -668,20 +681,22 @@ class UnblockedUsersView(discord.ui.View):
         options = [discord.SelectOption(label=member.display_name, value=str(member.id)) for member in blocked_members]
         select = discord.ui.Select(placeholder="Select a user to unblock...", options=options)
 
+        @ack_first()
         async def select_callback(select_interaction: discord.Interaction):
+            if channel_store.get(self.channel_id) is not info or info.owner_id != select_interaction.user.id:
+                await reply(select_interaction, "❌ Only the channel owner can unblock users.", ephemeral=True)
+                return
+
             user_id = int(select_interaction.data['values'][0])
-            temp_channels[self.channel_id]["blocked_users"].remove(user_id)
-            save_temp_channels(temp_channels)
+            if info.unblock(user_id):
+                channel_store.save(self.channel_id, "unblock")
 
             channel = guild.get_channel(self.channel_id)
             user = guild.get_member(user_id)
             if channel and user:
-                overwrites = channel.overwrites
-                if user in overwrites:
-                    del overwrites[user]
-                    await channel.edit(overwrites=overwrites, reason="User unblocked by owner via EchoNet")
+                await overwrite_manager.update(channel, user, None, reason="User unblocked by owner via EchoNet")
 
-            await select_interaction.response.send_message(f"✅ {user.mention} has been unblocked.", ephemeral=True)
+            await reply(select_interaction, f"✅ {user.mention} has been unblocked.", ephemeral=True)
 
         select.callback = select_callback
         view = discord.ui.View(timeout=60)
@@ -695,11 +710,11 @@ class BlockUserModal(discord.ui.Modal, title="Block User"):
 
     user_id = discord.ui.TextInput(label="User ID or @mention", placeholder="Enter user ID or mention them...")
 
+    @ack_first()
     async def on_submit(self, interaction: discord.Interaction):
-        from data import load_temp_channels, save_temp_channels
-        temp_channels = load_temp_channels()
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
+        info = channel_store.get(self.channel_id)
+        if info is None:
+            await reply(interaction, "❌ Channel not found.", ephemeral=True)
             return
 
         # Parse user ID
@@ -710,339 +725,426 @@ class BlockUserModal(discord.ui.Modal, title="Block User"):
             try:
                 user_id = int(user_input)
             except ValueError:
-                await interaction.response.send_message("❌ Invalid user ID or mention.", ephemeral=True)
+                await reply(interaction, "❌ Invalid user ID or mention.", ephemeral=True)
                 return
 
         user = interaction.guild.get_member(user_id)
         if not user:
-            await interaction.response.send_message("❌ User not found in this server.", ephemeral=True)
+            await reply(interaction, "❌ User not found in this server.", ephemeral=True)
             return
 
-        if user_id in temp_channels[self.channel_id]["blocked_users"]:
-            await interaction.response.send_message("❌ User is already blocked.", ephemeral=True)
+        if not info.block(user_id):
+            await reply(interaction, "❌ User is already blocked.", ephemeral=True)
             return
 
-        temp_channels[self.channel_id]["blocked_users"].append(user_id)
-        save_temp_channels(temp_channels)
+        channel_store.save(self.channel_id, "block")
 
         # Remove user from channel if they're in it
         channel = interaction.guild.get_channel(self.channel_id)
         if channel and user.voice and user.voice.channel == channel:
             try:
-                await user.move_to(None, reason="User blocked by channel owner")
+                await rest_queue.submit(user.move_to(None, reason="User blocked by channel owner"), USER, "member_move", interaction.guild.id)
             except discord.Forbidden:
                 pass
 
-        await interaction.response.send_message(f"✅ Blocked {user.display_name} from the channel.", ephemeral=True)
+        await reply(interaction, f"✅ Blocked {user.display_name} from the channel.", ephemeral=True)
 
-class JoinRequestView(discord.ui.View):
-    def __init__(self, channel_id, requester_id, guild_id):
-        super().__init__(timeout=300)  # 5 minute timeout
-        self.channel_id = channel_id
-        self.requester_id = requester_id
-        self.guild_id = guild_id
+# Channels per page of the channel list (embeds hold at most 25 fields)
+LIST_PAGE_SIZE = 10
+ACCESS_FILTERS = {
+    "all": "All channels",
+    "open": "🌐 Open",
+    "request": "🔒 Request Only",
+}
 
-    @discord.ui.button(label="Approve", style=discord.ButtonStyle.green, emoji="✅")
-    async def approve_request(self, interaction: discord.Interaction, button: discord.ui.Button):
-        from data import load_temp_channels, save_temp_channels
-        temp_channels = load_temp_channels()
+class ChannelListCache:
+    """Rendered channel list pages per guild and access filter.
 
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel no longer exists!", ephemeral=True)
-            return
-
-        info = temp_channels[self.channel_id]
-        if self.requester_id in info.get("pending_requests", []):
-            info["pending_requests"].remove(self.requester_id)
-            save_temp_channels(temp_channels)
-
-            # Grant access to the channel
-            guild = interaction.client.get_guild(self.guild_id)
-            if guild:
-                channel = guild.get_channel(self.channel_id)
-                requester = guild.get_member(self.requester_id)
-                if channel and requester:
-                    try:
-                        overwrites = channel.overwrites
-                        overwrites[requester] = discord.PermissionOverwrite(connect=True, view_channel=True)
-                        await channel.edit(overwrites=overwrites, reason="Join request approved")
-
-                        # Notify requester
-                        try:
-                            await requester.send(f"✅ Your request to join **{channel.name}** in **{guild.name}** has been approved! You can now join the channel.")
-                        except:
-                            pass
-
-                        await interaction.response.send_message(f"✅ Approved {requester.display_name}'s request to join {channel.name}!", ephemeral=True)
-                    except discord.Forbidden:
-                        await interaction.response.send_message("❌ I don't have permission to edit the channel.", ephemeral=True)
-                else:
-                    await interaction.response.send_message("❌ Channel or user not found!", ephemeral=True)
-            else:
-                await interaction.response.send_message("❌ Server not found!", ephemeral=True)
-        else:
-            await interaction.response.send_message("❌ Request not found or already processed!", ephemeral=True)
-
-    @discord.ui.button(label="Deny", style=discord.ButtonStyle.red, emoji="❌")
-    async def deny_request(self, interaction: discord.Interaction, button: discord.ui.Button):
-        from data import load_temp_channels, save_temp_channels
-        temp_channels = load_temp_channels()
+    A guild's pages are dropped when one of its channels is created,
+    changed or removed (it listens to the channel store), and by main.py
+    on voice state and channel updates, since member counts and names are
+    part of the page.
+    """
 
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel no longer exists!", ephemeral=True)
-            return
-
-        info = temp_channels[self.channel_id]
-        if self.requester_id in info.get("pending_requests", []):
-            info["pending_requests"].remove(self.requester_id)
-            save_temp_channels(temp_channels)
-
-            # Notify requester
-            guild = interaction.client.get_guild(self.guild_id)
-            if guild:
-                channel = guild.get_channel(self.channel_id)
-                requester = guild.get_member(self.requester_id)
-                if channel and requester:
-                    try:
-                        await requester.send(f"❌ Your request to join **{channel.name}** in **{guild.name}** has been denied.")
-                    except:
-                        pass
-                    await interaction.response.send_message(f"❌ Denied {requester.display_name}'s request to join {channel.name}.", ephemeral=True)
-                else:
-                    await interaction.response.send_message("❌ Channel or user not found!", ephemeral=True)
-            else:
-                await interaction.response.send_message("❌ Server not found!", ephemeral=True)
-        else:
-            await interaction.response.send_message("❌ Request not found or already processed!", ephemeral=True)
-
-class ApproveDenyView(discord.ui.View):
     def __init__(self):
-        super().__init__(timeout=None)
-
-    @discord.ui.button(label="Approve", style=discord.ButtonStyle.green, emoji="✅", custom_id="approve_request")
-    async def approve_request(self, interaction: discord.Interaction, button: discord.ui.Button):
-        # Implementation for approving requests
-        await interaction.response.send_message("Request approved!", ephemeral=True)
-
-    @discord.ui.button(label="Deny", style=discord.ButtonStyle.red, emoji="❌", custom_id="deny_request")
-    async def deny_request(self, interaction: discord.Interaction, button: discord.ui.Button):
-        # Implementation for denying requests
-        await interaction.response.send_message("Request denied!", ephemeral=True)
-
-class ListChannelsView(discord.ui.View):
-    def __init__(self, user_id, guild):
-        super().__init__(timeout=120)
-        self.user_id = user_id
-        self.guild = guild
-
-    async def send_channel_list(self, interaction: discord.Interaction):
-        from data import load_temp_channels
-        temp_channels = load_temp_channels()
-
-        guild = interaction.guild
-
-        if not temp_channels:
-            await interaction.response.send_message("❌ There are no active voice channels.", ephemeral=True)
-            return
-
-        embed = discord.Embed(
-            title="📋 Active Voice Channels",
-            color=0x00ff00
-        )
+        self._pages = {}
+        # Channel ID -> guild ID, so a removal (which carries no record) finds its guild
+        self._guild_of = {}
 
-        request_only_channels = []
+    def invalidate(self, guild_id):
+        self._pages.pop(guild_id, None)
 
-        for cid, info in temp_channels.items():
-            channel = guild.get_channel(cid)
-            if not channel:
+    def on_channel_changed(self, channel_id, info):
+        if info is None:
+            guild_id = self._guild_of.pop(channel_id, None)
+        else:
+            guild_id = self._guild_of[channel_id] = info.guild_id
+        if guild_id is not None:
+            self.invalidate(guild_id)
+
+    def pages(self, guild, access):
+        """List of (embed, [(channel ID, channel name, record)]) pages."""
+        guild_pages = self._pages.setdefault(guild.id, {})
+        if access not in guild_pages:
+            guild_pages[access] = self._render(guild, access)
+        return guild_pages[access]
+
+    def _render(self, guild, access):
+        entries = []
+        for cid, info in channel_store.in_guild(guild.id):
+            if access == "open" and info.request_only or access == "request" and not info.request_only:
                 continue
-            expires = info["expires_at"]
-            if isinstance(expires, datetime.datetime):
-                expires_str = expires.strftime("%Y-%m-%d %H:%M UTC")
-            else:
-                expires_str = str(expires)
-            access = "🔒 Request Only" if info.get("request_only") else "🌐 Open"
-            owner = guild.get_member(info["owner_id"])
-            owner_name = owner.mention if owner else f"User ID {info['owner_id']}"
-
-            # Add member count
-            member_count = len(channel.members) if hasattr(channel, 'members') else 0
-
-            embed.add_field(
-                name=f"🎤 {channel.name}",
-                value=f"**Owner:** {owner_name}\n**Access:** {access}\n**Members:** {member_count}\n**Expires:** {expires_str}",
-                inline=False
-            )
-
-            # Check if user can request to join this channel
-            if (info.get("request_only") and 
-                info["owner_id"] != self.user_id and 
-                self.user_id not in info.get("pending_requests", []) and
-                self.user_id not in info.get("blocked_users", [])):
-                request_only_channels.append((cid, channel.name, info["owner_id"]))
-
-        # Add request join buttons for request-only channels
-        for cid, channel_name, owner_id in request_only_channels:
-            self.add_item(RequestJoinButton(cid, channel_name, owner_id, self.user_id))
+            channel = guild.get_channel(cid)
+            if channel:
+                entries.append((cid, channel, info))
 
-        if request_only_channels:
-            embed.add_field(
-                name="💡 Tip",
-                value="Use the buttons below to request access to private channels!",
-                inline=False
+        chunks = [entries[i:i + LIST_PAGE_SIZE] for i in range(0, len(entries), LIST_PAGE_SIZE)] or [[]]
+        pages = []
+        for number, chunk in enumerate(chunks, start=1):
+            embed = discord.Embed(
+                title="📋 Active Voice Channels",
+                color=0x00ff00
             )
+            if not chunk:
+                embed.description = "No channels match this filter."
+            for cid, channel, info in chunk:
+                expires_str = info.expires_datetime.strftime("%Y-%m-%d %H:%M UTC")
+                access_text = "🔒 Request Only" if info.request_only else "🌐 Open"
+                owner = guild.get_member(info.owner_id)
+                owner_name = owner.mention if owner else f"User ID {info.owner_id}"
 
-        await interaction.response.send_message(embed=embed, view=self, ephemeral=True)
+                # Add member count
+                member_count = len(channel.members) if hasattr(channel, 'members') else 0
 
-class RequestJoinButton(discord.ui.Button):
-    def __init__(self, channel_id, channel_name, owner_id, requester_id):
-        # Truncate channel name if too long for button label
-        display_name = channel_name[:20] + "..." if len(channel_name) > 20 else channel_name
-        super().__init__(
-            label=f"🔐 Join {display_name}",
-            style=discord.ButtonStyle.secondary,
-            emoji="📨",
-            custom_id=f"reqjoin_{channel_id}"
+                embed.add_field(
+                    name=f"🎤 {channel.name}",
+                    value=f"**Owner:** {owner_name}\n**Access:** {access_text}\n**Members:** {member_count}\n**Expires:** {expires_str}",
+                    inline=False
+                )
+            embed.set_footer(text=f"{ACCESS_FILTERS[access]} • Page {number}/{len(chunks)} • {len(entries)} channel(s)")
+            pages.append((embed, [(cid, channel.name, info) for cid, channel, info in chunk]))
+        return pages
+
+channel_list_cache = ChannelListCache()
+channel_store.subscribe(channel_list_cache.on_channel_changed)
+
+def channel_list_page(guild, user_id, access="all", page=0):
+    """Embed and routed components for one page of the channel list, as seen by user_id."""
+    pages = channel_list_cache.pages(guild, access)
+    page = max(0, min(page, len(pages) - 1))
+    embed, entries = pages[page]
+
+    items = []
+    for cid, channel_name, info in entries:
+        # Check if user can request to join this channel
+        if (info.request_only and
+            info.owner_id != user_id and
+            user_id not in info.pending_requests and
+            user_id not in info.blocked_users):
+            # Truncate channel name if too long for button label
+            display_name = channel_name[:20] + "..." if len(channel_name) > 20 else channel_name
+            items.append(router.button("request_join", cid, label=f"🔐 Join {display_name}", style=discord.ButtonStyle.secondary, emoji="📨"))
+
+    if items:
+        # The cached page is shared; add the tip to a copy
+        embed = embed.copy()
+        embed.add_field(
+            name="💡 Tip",
+            value="Use the buttons below to request access to private channels!",
+            inline=False
         )
-        self.channel_id = channel_id
-        self.channel_name = channel_name
-        self.owner_id = owner_id
-        self.requester_id = requester_id
-
-    async def callback(self, interaction: discord.Interaction):
-        from data import load_temp_channels, save_temp_channels
-        temp_channels = load_temp_channels()
 
-        info = temp_channels.get(self.channel_id)
-        if not info:
-            await interaction.response.send_message("❌ Channel not found or no longer exists!", ephemeral=True)
-            return
-
-        # Check if user is blocked
-        if self.requester_id in info.get("blocked_users", []):
-            await interaction.response.send_message("❌ You have been blocked from this channel.", ephemeral=True)
-            return
-
-        if "pending_requests" not in info:
-            info["pending_requests"] = []
-        if self.requester_id in info["pending_requests"]:
-            await interaction.response.send_message("❌ You have already requested to join this channel. Please wait for the owner's response.", ephemeral=True)
-            return
-
-        info["pending_requests"].append(self.requester_id)
-        save_temp_channels(temp_channels)
-
-        await interaction.response.send_message(f"✅ Your request to join **{self.channel_name}** has been sent to the channel owner!", ephemeral=True)
-
-        # Send DM to channel owner
-        owner = interaction.guild.get_member(self.owner_id)
-        channel = interaction.guild.get_channel(self.channel_id)
-        requester = interaction.user
-        if owner and channel:
+    items.append(router.select(
+        "list_filter", guild.id,
+        options=[
+            discord.SelectOption(label=label, value=value, default=value == access)
+            for value, label in ACCESS_FILTERS.items()
+        ],
+        row=3
+    ))
+    items.append(router.button("list_page", guild.id, access, page - 1, label="◀ Previous", style=discord.ButtonStyle.secondary, row=4, disabled=page == 0))
+    items.append(router.button("list_page", guild.id, access, page + 1, label="Next ▶", style=discord.ButtonStyle.secondary, row=4, disabled=page >= len(pages) - 1))
+    return embed, router.view(*items)
+
+async def send_channel_list(interaction: discord.Interaction):
+    if not channel_store.in_guild(interaction.guild.id):
+        await interaction.response.send_message("❌ There are no active voice channels.", ephemeral=True)
+        return
+
+    embed, view = channel_list_page(interaction.guild, interaction.user.id)
+    await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+
+@router.route("list_page")
+async def list_page(interaction: discord.Interaction, _, access, page):
+    embed, view = channel_list_page(interaction.guild, interaction.user.id, access, int(page))
+    await interaction.response.edit_message(embed=embed, view=view)
+
+@router.route("list_filter")
+async def list_filter(interaction: discord.Interaction, _):
+    embed, view = channel_list_page(interaction.guild, interaction.user.id, interaction.data['values'][0])
+    await interaction.response.edit_message(embed=embed, view=view)
+
+@router.route("request_join")
+async def request_join(interaction: discord.Interaction, channel_id):
+    info = channel_store.get(channel_id)
+    if not info:
+        await interaction.response.send_message("❌ Channel not found or no longer exists!", ephemeral=True)
+        return
+
+    requester = interaction.user
+    # Check if user is blocked
+    if requester.id in info.blocked_users:
+        await interaction.response.send_message("❌ You have been blocked from this channel.", ephemeral=True)
+        return
+
+    if requester.id in info.pending_requests:
+        await interaction.response.send_message("❌ You have already requested to join this channel. Please wait for the owner's response.", ephemeral=True)
+        return
+
+    info.add_request(requester.id)
+    channel_store.save(channel_id, "request")
+
+    # Send DM to channel owner
+    owner = interaction.guild.get_member(info.owner_id)
+    channel = interaction.guild.get_channel(channel_id)
+    channel_name = channel.name if channel else "the channel"
+    await interaction.response.send_message(f"✅ Your request to join **{channel_name}** has been sent to the channel owner!", ephemeral=True)
+
+    if owner and channel:
+        embed = discord.Embed(
+            title="🔔 Voice Channel Join Request",
+            description=f"**{requester.display_name}** ({requester.mention}) has requested to join your channel **{channel.name}** in **{interaction.guild.name}**.",
+            color=0x3498db
+        )
+        embed.set_thumbnail(url=requester.display_avatar.url)
+        embed.add_field(name="Channel", value=channel.name, inline=True)
+        embed.add_field(name="Server", value=interaction.guild.name, inline=True)
+        embed.add_field(name="Requested by", value=f"{requester.display_name}\n{requester.mention}", inline=False)
+
+        view = join_request_view(channel_id, requester.id)
+        delivered = await dm_service.join_request(owner, requester, channel, embed, view)
+        if not delivered:
+            # If can't DM owner, try to find them in the channel and ping them
             try:
-                embed = discord.Embed(
-                    title="🔔 Voice Channel Join Request",
-                    description=f"**{requester.display_name}** ({requester.mention}) has requested to join your channel **{channel.name}** in **{interaction.guild.name}**.",
-                    color=0x3498db
-                )
-                embed.set_thumbnail(url=requester.display_avatar.url)
-                embed.add_field(name="Channel", value=channel.name, inline=True)
-                embed.add_field(name="Server", value=interaction.guild.name, inline=True)
-                embed.add_field(name="Requested by", value=f"{requester.display_name}\n{requester.mention}", inline=False)
-
-                view = JoinRequestView(self.channel_id, requester.id, interaction.guild.id)
-                await owner.send(embed=embed, view=view)
-            except discord.Forbidden:
-                # If can't DM owner, try to find them in the channel and ping them
-                try:
-                    settings = load_settings()
-                    guild_id = str(interaction.guild.id)
-                    if guild_id in settings:
-                        text_channel_id = settings[guild_id]["text_channel_id"]
-                        text_channel = interaction.guild.get_channel(text_channel_id)
-                        if text_channel:
-                            await text_channel.send(f"🔔 {owner.mention}, **{requester.display_name}** has requested to join your channel **{channel.name}**. Please check your DMs or use the manage channel menu.")
-                except:
-                    pass
+                settings = load_settings()
+                guild_id = str(interaction.guild.id)
+                if guild_id in settings:
+                    text_channel_id = settings[guild_id]["text_channel_id"]
+                    text_channel = interaction.guild.get_channel(text_channel_id)
+                    if text_channel:
+                        notice = await rest_queue.submit(text_channel.send(f"🔔 {owner.mention}, **{requester.display_name}** has requested to join your channel **{channel.name}**. Please check your DMs or use the manage channel menu."), USER, "message_send", text_channel.id)
+                        # Don't leave the ping burying the main menu
+                        delete_management_menu_and_restore_main(text_channel, notice)
+            except:
+                pass
 
-async def purge_menu_text_channel(menu_text_channel):
-    """Remove all messages from the menu text channel except pinned ones."""
+def get_guild_setting(guild, key):
+    """Read one value from a guild's settings (None if unset or the guild isn't set up)."""
+    return load_settings().get(str(guild.id), {}).get(key)
+
+def set_guild_setting(guild, key, value):
+    """Store one value in a set-up guild's settings.
+
+    Meant for bookkeeping written on every purge or menu post: the value is
+    changed in memory right away and written by a background flush.
+    """
+    guild_settings = load_settings().get(str(guild.id))
+    if guild_settings is None or guild_settings.get(key) == value:
+        return
+    guild_settings[key] = value
+    save_settings_later()
+
+def menu_channel_is_clean(menu_text_channel):
+    """True if nothing was posted after the main menu and the last purge.
+
+    Decided from the channel's cached last_message_id, without reading
+    any history.
+    """
+    last_message_id = menu_text_channel.last_message_id
+    menu_message_id = get_guild_setting(menu_text_channel.guild, "main_menu_message_id")
+    if last_message_id is None or menu_message_id is None:
+        return False
+    cursor = get_guild_setting(menu_text_channel.guild, "purge_cursor") or 0
+    return last_message_id <= max(menu_message_id, cursor)
+
+async def delete_old_messages(messages):
+    """Single-delete lane for messages bulk delete can't remove (older than 14 days).
+
+    Runs one at a time at maintenance priority so it never crowds out other
+    work. Returns the messages that could not be deleted.
+    """
+    failed = []
+    for message in messages:
+        try:
+            await rest_queue.submit(message.delete(), MAINTENANCE, "message_delete", message.channel.id)
+        except discord.NotFound:
+            pass
+        except discord.HTTPException:
+            failed.append(message)
+    return failed
+
+async def purge_menu_text_channel(menu_text_channel, priority=MAINTENANCE):
+    """Remove all messages from the menu text channel except pinned ones.
+
+    Only messages newer than the last purge's cursor (kept in guild
+    settings as purge_cursor) are read. A cursor left over from an older
+    menu channel predates this channel, so it simply means a full scan.
+
+    priority is the REST queue class the deletes run at: MAINTENANCE for
+    the periodic cleanup, USER when someone is waiting on it (!voice).
+    """
     try:
-        # Delete messages in batches for better performance
+        me = menu_text_channel.guild.me
+        cursor = get_guild_setting(menu_text_channel.guild, "purge_cursor")
+        # May point at a message delete_queue already removed, which history
+        # never returns; read it before scanning so later posts aren't skipped
+        last_message_id = menu_text_channel.last_message_id
+        after = discord.Object(id=cursor) if cursor else None
+        # Bulk delete refuses messages older than 14 days; keep a margin
+        bulk_cutoff = discord.utils.utcnow() - datetime.timedelta(days=14) + datetime.timedelta(minutes=5)
         messages_to_delete = []
-        
-        # Check all messages, not just the last 100
-        async for message in menu_text_channel.history(limit=None):
-            if not message.pinned and message.author != menu_text_channel.guild.me:
-                messages_to_delete.append(message)
-            # Also delete old bot messages that aren't the main menu
-            elif (message.author == menu_text_channel.guild.me and 
-                  not message.content.startswith(MAIN_MENU_TAG)):
-                messages_to_delete.append(message)
-        
+        old_messages = []
+        newest_seen = cursor
+
+        async for message in menu_text_channel.history(limit=None, after=after, oldest_first=True):
+            newest_seen = message.id
+            if message.pinned:
+                continue
+            # Delete user messages and bot messages that aren't the main menu
+            if message.author != me or not message.content.startswith(MAIN_MENU_TAG):
+                if message.created_at < bulk_cutoff:
+                    old_messages.append(message)
+                else:
+                    messages_to_delete.append(message)
+
+        failed = []
         # Delete messages in batches of 100 (Discord's bulk delete limit)
         while messages_to_delete:
             batch = messages_to_delete[:100]
             messages_to_delete = messages_to_delete[100:]
-            
+
             if len(batch) == 1:
                 # Single message deletion
                 try:
-                    await batch[0].delete()
-                except:
+                    await rest_queue.submit(batch[0].delete(), priority, "message_delete", menu_text_channel.id)
+                except discord.NotFound:
                     pass
+                except discord.HTTPException:
+                    failed.append(batch[0])
             else:
                 # Bulk deletion for multiple messages
                 try:
-                    await menu_text_channel.delete_messages(batch)
+                    await rest_queue.submit(menu_text_channel.delete_messages(batch), priority, "bulk_delete", menu_text_channel.id)
                 except discord.HTTPException:
                     # If bulk delete fails, delete individually
                     for msg in batch:
                         try:
-                            await msg.delete()
-                        except:
+                            await rest_queue.submit(msg.delete(), priority, "message_delete", menu_text_channel.id)
+                        except discord.NotFound:
                             pass
-                except:
-                    pass
-                    
+                        except discord.HTTPException:
+                            failed.append(msg)
+
+        failed += await delete_old_messages(old_messages)
+
+        if failed:
+            # Stop the cursor short of anything that is still there
+            newest_seen = min(msg.id for msg in failed) - 1
+        elif last_message_id:
+            newest_seen = max(newest_seen or 0, last_message_id)
+        if newest_seen:
+            set_guild_setting(menu_text_channel.guild, "purge_cursor", newest_seen)
+
     except Exception as e:
         print(f"Error purging menu channel: {e}")
 
-async def ensure_main_menu(menu_text_channel):
-    """Ensure the main menu exists in the text channel."""
-    found_main_menu = None
-    async for msg in menu_text_channel.history(limit=20):
-        if msg.author == menu_text_channel.guild.me and msg.content.startswith(MAIN_MENU_TAG):
-            found_main_menu = msg
-            break
-
-    if not found_main_menu:
-        embed = discord.Embed(
-            title="🎤 Voice Channel Creator",
-            description="Create your own temporary voice channel!",
-            color=0x00ff00
-        )
-        embed.add_field(
-            name="Features",
-            value="• Custom duration\n• Access control\n• Channel management",
-            inline=False
-        )
-        view = MainMenu()
-        main_menu_msg = await menu_text_channel.send(f"{MAIN_MENU_TAG}", embed=embed, view=view)
-        return main_menu_msg
-    return found_main_menu
-
-async def delete_management_menu_and_restore_main(menu_text_channel, management_msg, delay=300):
-    """Delete management menu after delay and restore main menu."""
-    await asyncio.sleep(delay)
+async def ensure_main_menu(menu_text_channel, priority=MAINTENANCE):
+    """Ensure the main menu exists in the text channel.
+
+    The menu's message ID is kept in guild settings (main_menu_message_id),
+    so an existing menu is refreshed with one edit by ID; a new one is only
+    sent (and pinned) if that edit finds no message.
+    """
+    embed = discord.Embed(
+        title="🎤 Voice Channel Creator",
+        description="Create your own temporary voice channel!",
+        color=0x00ff00
+    )
+    embed.add_field(
+        name="Features",
+        value="• Custom duration\n• Access control\n• Channel management",
+        inline=False
+    )
+
+    guild = menu_text_channel.guild
+    menu_message_id = get_guild_setting(guild, "main_menu_message_id")
+    if menu_message_id is None:
+        # Menus sent before the ID was stored: adopt one if it's recent
+        async for msg in menu_text_channel.history(limit=20):
+            if msg.author == guild.me and msg.content.startswith(MAIN_MENU_TAG):
+                menu_message_id = msg.id
+                break
+
+    if menu_message_id is not None:
+        try:
+            main_menu_msg = await rest_queue.submit(
+                menu_text_channel.get_partial_message(menu_message_id).edit(
+                    content=MAIN_MENU_TAG, embed=embed, view=MainMenu()
+                ), priority, "message_send", menu_text_channel.id
+            )
+            set_guild_setting(guild, "main_menu_message_id", main_menu_msg.id)
+            return main_menu_msg
+        except discord.NotFound:
+            pass  # Deleted, or from an older menu channel
+
+    view = MainMenu()
+    main_menu_msg = await rest_queue.submit(
+        menu_text_channel.send(f"{MAIN_MENU_TAG}", embed=embed, view=view), priority, "message_send", menu_text_channel.id
+    )
     try:
-        await management_msg.delete()
-    except:
+        # Pinned messages are skipped by purges
+        await rest_queue.submit(main_menu_msg.pin(reason="EchoNet main menu"), priority, "message_send", menu_text_channel.id)
+    except discord.HTTPException:
         pass
+    set_guild_setting(guild, "main_menu_message_id", main_menu_msg.id)
+    return main_menu_msg
+
+def restore_menu_job_key(menu_text_channel):
+    return f"restore_main_menu:{menu_text_channel.id}"
+
+def delete_management_menu_and_restore_main(menu_text_channel, management_msg, delay=300):
+    """Schedule the management menu's deletion and a main menu restore after delay.
+
+    management_msg is any bot message posted in the menu channel besides
+    the main menu; today that is the join request ping sent when the
+    owner's DMs are closed. Runs as a persisted deferred job
+    ("restore_main_menu"), one per menu channel: scheduling again pushes
+    the restore back and adds this message to the ones it will delete.
+    """
+    key = restore_menu_job_key(menu_text_channel)
+    pending = job_scheduler.get(key)
+    message_ids = pending["args"]["message_ids"] if pending else []
+    job_scheduler.schedule(
+        key,
+        "restore_main_menu",
+        delay,
+        guild_id=menu_text_channel.guild.id,
+        channel_id=menu_text_channel.id,
+        message_ids=message_ids + [management_msg.id],
+    )
+
+async def restore_main_menu(menu_text_channel, message_ids):
+    """Deferred job body: delete management menus, then purge and restore the main menu."""
+    for message_id in message_ids:
+        try:
+            await rest_queue.submit(
+                menu_text_channel.get_partial_message(message_id).delete(), MAINTENANCE, "message_delete", menu_text_channel.id
+            )
+        except:
+            pass
     await purge_menu_text_channel(menu_text_channel)
     await ensure_main_menu(menu_text_channel)
 
-
 class TransferOwnershipModal(discord.ui.Modal, title="Transfer Ownership"):
     def __init__(self, channel_id):
         super().__init__()
@@ -1050,11 +1152,11 @@ class TransferOwnershipModal(discord.ui.Modal, title="Transfer Ownership"):
 
     user_id = discord.ui.TextInput(label="New Owner (User ID or @mention)", placeholder="Enter user ID or mention them...")
 
+    @ack_first()
     async def on_submit(self, interaction: discord.Interaction):
-        from data import load_temp_channels, save_temp_channels
-        temp_channels = load_temp_channels()
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
+        info = channel_store.get(self.channel_id)
+        if info is None:
+            await reply(interaction, "❌ Channel not found.", ephemeral=True)
             return
 
         # Parse user ID
@@ -1065,45 +1167,46 @@ class TransferOwnershipModal(discord.ui.Modal, title="Transfer Ownership"):
             try:
                 new_owner_id = int(user_input)
             except ValueError:
-                await interaction.response.send_message("❌ Invalid user ID or mention.", ephemeral=True)
+                await reply(interaction, "❌ Invalid user ID or mention.", ephemeral=True)
                 return
 
         new_owner = interaction.guild.get_member(new_owner_id)
         if not new_owner:
-            await interaction.response.send_message("❌ User not found in this server.", ephemeral=True)
+            await reply(interaction, "❌ User not found in this server.", ephemeral=True)
             return
 
-        if new_owner_id == temp_channels[self.channel_id]["owner_id"]:
-            await interaction.response.send_message("❌ This user is already the owner.", ephemeral=True)
+        if new_owner_id == info.owner_id:
+            await reply(interaction, "❌ This user is already the owner.", ephemeral=True)
             return
 
         # Transfer ownership
-        temp_channels[self.channel_id]["owner_id"] = new_owner_id
-        save_temp_channels(temp_channels)
+        channel_store.set_owner(self.channel_id, new_owner_id)
 
         # Update channel permissions
         channel = interaction.guild.get_channel(self.channel_id)
         if channel:
             try:
-                overwrites = channel.overwrites
+                updates = []
                 # Remove old owner's manage permissions
                 old_owner = interaction.user
-                if old_owner in overwrites:
-                    overwrites[old_owner] = discord.PermissionOverwrite(connect=True, view_channel=True)
+                if old_owner in channel.overwrites:
+                    updates.append(overwrite_manager.update(
+                        channel, old_owner, discord.PermissionOverwrite(connect=True, view_channel=True), reason="Ownership transferred"
+                    ))
 
                 # Give new owner manage permissions
-                overwrites[new_owner] = discord.PermissionOverwrite(manage_channels=True, connect=True, view_channel=True)
-                await channel.edit(overwrites=overwrites, reason="Ownership transferred")
+                updates.append(overwrite_manager.update(
+                    channel, new_owner, discord.PermissionOverwrite(manage_channels=True, connect=True, view_channel=True), reason="Ownership transferred"
+                ))
+                # Sent concurrently, one set_permissions call per target
+                await asyncio.gather(*updates)
 
                 # Notify new owner
-                try:
-                    await new_owner.send(f"🎉 You are now the owner of the voice channel **{channel.name}** in **{interaction.guild.name}**!")
-                except:
-                    pass
+                dm_service.notify(new_owner, f"🎉 You are now the owner of the voice channel **{channel.name}** in **{interaction.guild.name}**!")
 
-                await interaction.response.send_message(f"✅ Ownership of the channel has been transferred to {new_owner.display_name}!", ephemeral=True)
+                await reply(interaction, f"✅ Ownership of the channel has been transferred to {new_owner.display_name}!", ephemeral=True)
             except discord.Forbidden:
-                await interaction.response.send_message("❌ I don't have permission to edit the channel.", ephemeral=True)
+                await reply(interaction, "❌ I don't have permission to edit the channel.", ephemeral=True)
 
 class InviteUserModal(discord.ui.Modal, title="Invite User"):
     def __init__(self, channel_id):
@@ -1112,11 +1215,11 @@ class InviteUserModal(discord.ui.Modal, title="Invite User"):
 
     user_id = discord.ui.TextInput(label="User to Invite (User ID or @mention)", placeholder="Enter user ID or mention them...")
 
+    @ack_first()
     async def on_submit(self, interaction: discord.Interaction):
-        from data import load_temp_channels, save_temp_channels
-        temp_channels = load_temp_channels()
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
+        info = channel_store.get(self.channel_id)
+        if info is None:
+            await reply(interaction, "❌ Channel not found.", ephemeral=True)
             return
 
         # Parse user ID
@@ -1127,139 +1230,119 @@ class InviteUserModal(discord.ui.Modal, title="Invite User"):
             try:
                 invite_user_id = int(user_input)
             except ValueError:
-                await interaction.response.send_message("❌ Invalid user ID or mention.", ephemeral=True)
+                await reply(interaction, "❌ Invalid user ID or mention.", ephemeral=True)
                 return
 
         invite_user = interaction.guild.get_member(invite_user_id)
         if not invite_user:
-            await interaction.response.send_message("❌ User not found in this server.", ephemeral=True)
+            await reply(interaction, "❌ User not found in this server.", ephemeral=True)
             return
 
-        info = temp_channels[self.channel_id]
-        if invite_user_id in info.get("blocked_users", []):
-            await interaction.response.send_message("❌ This user is blocked from the channel.", ephemeral=True)
+        if invite_user_id in info.blocked_users:
+            await reply(interaction, "❌ This user is blocked from the channel.", ephemeral=True)
             return
 
         channel = interaction.guild.get_channel(self.channel_id)
         if not channel:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
+            await reply(interaction, "❌ Channel not found.", ephemeral=True)
             return
 
         # Grant access to the channel
         try:
-            overwrites = channel.overwrites
-            overwrites[invite_user] = discord.PermissionOverwrite(connect=True, view_channel=True)
-            await channel.edit(overwrites=overwrites, reason="User invited by owner")
+            await overwrite_manager.update(
+                channel, invite_user, discord.PermissionOverwrite(connect=True, view_channel=True), reason="User invited by owner"
+            )
 
             # Remove from pending requests if they're there
-            if invite_user_id in info.get("pending_requests", []):
-                info["pending_requests"].remove(invite_user_id)
-                save_temp_channels(temp_channels)
+            if info.remove_request(invite_user_id):
+                channel_store.save(self.channel_id, "invite")
 
             # Notify invited user
-            try:
-                await invite_user.send(f"🎉 You've been invited to join the voice channel **{channel.name}** in **{interaction.guild.name}**! You can now join the channel.")
-            except:
-                pass
+            dm_service.notify(invite_user, f"🎉 You've been invited to join the voice channel **{channel.name}** in **{interaction.guild.name}**! You can now join the channel.")
 
-            await interaction.response.send_message(f"✅ Successfully invited {invite_user.display_name} to the channel!", ephemeral=True)
+            await reply(interaction, f"✅ Successfully invited {invite_user.display_name} to the channel!", ephemeral=True)
         except discord.Forbidden:
-            await interaction.response.send_message("❌ I don't have permission to edit the channel.", ephemeral=True)
-
-class KickUserView(discord.ui.View):
-    def __init__(self, channel_id, owner_id):
-        super().__init__(timeout=120)
-        self.channel_id = channel_id
-        self.owner_id = owner_id
-
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        return interaction.user.id == self.owner_id
-
-    @discord.ui.button(label="Select User to Kick", style=discord.ButtonStyle.red, emoji="👢")
-    async def select_user_to_kick(self, interaction: discord.Interaction, button: discord.ui.Button):
-        channel = interaction.guild.get_channel(self.channel_id)
-        if not channel:
-            await interaction.response.send_message("❌ Channel not found!", ephemeral=True)
-            return
-
-        # Get users currently in the channel (excluding owner and bot)
-        kickable_users = [member for member in channel.members 
-                         if member.id != self.owner_id and not member.bot]
-
-        if not kickable_users:
-            await interaction.response.send_message("❌ No users to kick from this channel.", ephemeral=True)
-            return
-
-        options = [discord.SelectOption(label=member.display_name, value=str(member.id)) 
-                  for member in kickable_users[:25]]  # Discord limit
-
-        select = discord.ui.Select(placeholder="Select a user to kick...", options=options)
-
-        async def select_callback(select_interaction: discord.Interaction):
-            user_id = int(select_interaction.data['values'][0])
-            user = interaction.guild.get_member(user_id)
-            if user and user.voice and user.voice.channel == channel:
-                try:
-                    await user.move_to(None, reason="Kicked by channel owner")
-                    await select_interaction.response.send_message(f"✅ Kicked {user.display_name} from the channel.", ephemeral=True)
-                except discord.Forbidden:
-                    await select_interaction.response.send_message("❌ I don't have permission to move users.", ephemeral=True)
-            else:
-                await select_interaction.response.send_message("❌ User is not in the channel.", ephemeral=True)
-
-        select.callback = select_callback
-        view = discord.ui.View(timeout=60)
-        view.add_item(select)
-        await interaction.response.send_message("Select a user to kick:", view=view, ephemeral=True)
-
-class ExtendDurationView(discord.ui.View):
-    def __init__(self, channel_id, owner_id):
-        super().__init__(timeout=120)
-        self.channel_id = channel_id
-        self.owner_id = owner_id
-
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        return interaction.user.id == self.owner_id
-
-    @discord.ui.button(label="1 Hour", style=discord.ButtonStyle.secondary, emoji="⏰")
-    async def extend_1_hour(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.extend_channel(interaction, hours=1)
-
-    @discord.ui.button(label="6 Hours", style=discord.ButtonStyle.secondary, emoji="⏰")
-    async def extend_6_hours(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.extend_channel(interaction, hours=6)
-
-    @discord.ui.button(label="1 Day", style=discord.ButtonStyle.secondary, emoji="📅")
-    async def extend_1_day(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.extend_channel(interaction, days=1)
-
-    @discord.ui.button(label="1 Week", style=discord.ButtonStyle.secondary, emoji="📆")
-    async def extend_1_week(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.extend_channel(interaction, days=7)
-
-    async def extend_channel(self, interaction: discord.Interaction, days=0, hours=0):
-        from data import load_temp_channels, save_temp_channels
-        temp_channels = load_temp_channels()
-
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel not found!", ephemeral=True)
-            return
-
-        info = temp_channels[self.channel_id]
-        current_expires = info["expires_at"]
-        new_expires = current_expires + datetime.timedelta(days=days, hours=hours)
-
-        # Check if new expiration is within 60 days from now
-        max_expires = datetime.datetime.utcnow() + datetime.timedelta(days=60)
-        if new_expires > max_expires:
-            await interaction.response.send_message("❌ Cannot extend beyond 60 days from now.", ephemeral=True)
-            return
-
-        info["expires_at"] = new_expires
-        save_temp_channels(temp_channels)
-
-        duration_text = f"{days} day(s)" if days > 0 else f"{hours} hour(s)"
-        await interaction.response.send_message(f"✅ Channel duration extended by {duration_text}. New expiration: <t:{int(new_expires.timestamp())}:R>", ephemeral=True)
+            await reply(interaction, "❌ I don't have permission to edit the channel.", ephemeral=True)
+
+@router.route("kick_select")
+async def kick_select(interaction: discord.Interaction, channel_id):
+    info = channel_store.get(channel_id)
+    if info is None or info.owner_id != interaction.user.id:
+        await interaction.response.send_message("❌ Only the channel owner can kick users.", ephemeral=True)
+        return
+
+    channel = interaction.guild.get_channel(channel_id)
+    if not channel:
+        await interaction.response.send_message("❌ Channel not found!", ephemeral=True)
+        return
+
+    # Get users currently in the channel (excluding owner and bot)
+    kickable_users = [member for member in channel.members 
+                     if member.id != info.owner_id and not member.bot]
+
+    if not kickable_users:
+        await interaction.response.send_message("❌ No users to kick from this channel.", ephemeral=True)
+        return
+
+    options = [discord.SelectOption(label=member.display_name, value=str(member.id)) 
+              for member in kickable_users[:25]]  # Discord limit
+
+    select = router.select("kick_member", channel_id, placeholder="Select a user to kick...", options=options)
+    await interaction.response.send_message("Select a user to kick:", view=router.view(select), ephemeral=True)
+
+@router.route("kick_member")
+@ack_first()
+async def kick_member(interaction: discord.Interaction, channel_id):
+    info = channel_store.get(channel_id)
+    if info is None or info.owner_id != interaction.user.id:
+        await reply(interaction, "❌ Only the channel owner can kick users.", ephemeral=True)
+        return
+
+    channel = interaction.guild.get_channel(channel_id)
+    user_id = int(interaction.data['values'][0])
+    user = interaction.guild.get_member(user_id)
+    if channel and user and user.voice and user.voice.channel == channel:
+        try:
+            await rest_queue.submit(user.move_to(None, reason="Kicked by channel owner"), USER, "member_move", interaction.guild.id)
+            await reply(interaction, f"✅ Kicked {user.display_name} from the channel.", ephemeral=True)
+        except discord.Forbidden:
+            await reply(interaction, "❌ I don't have permission to move users.", ephemeral=True)
+    else:
+        await reply(interaction, "❌ User is not in the channel.", ephemeral=True)
+
+# Extend Duration choices: (label, hours, emoji)
+EXTEND_OPTIONS = (
+    ("1 Hour", 1, "⏰"),
+    ("6 Hours", 6, "⏰"),
+    ("1 Day", 24, "📅"),
+    ("1 Week", 168, "📆"),
+)
+
+@router.route("extend")
+async def extend_channel(interaction: discord.Interaction, channel_id, hours):
+    info = channel_store.get(channel_id)
+    if info is None:
+        await interaction.response.send_message("❌ Channel not found!", ephemeral=True)
+        return
+
+    if info.owner_id != interaction.user.id:
+        await interaction.response.send_message("❌ Only the channel owner can extend duration.", ephemeral=True)
+        return
+
+    hours = int(hours)
+    new_expires = info.expires_at + hours * 3600
+
+    # Check if new expiration is within 60 days from now
+    max_expires = epoch_now() + 60 * 86400
+    if new_expires > max_expires:
+        await interaction.response.send_message("❌ Cannot extend beyond 60 days from now.", ephemeral=True)
+        return
+
+    info.expires_at = new_expires
+    channel_store.save(channel_id, "extend")
+
+    duration_text = f"{hours // 24} day(s)" if hours % 24 == 0 else f"{hours} hour(s)"
+    await interaction.response.send_message(f"✅ Channel duration extended by {duration_text}. New expiration: <t:{new_expires}:R>", ephemeral=True)
 
 class SetUserLimitModal(discord.ui.Modal, title="Set User Limit"):
     def __init__(self, channel_id):
@@ -1268,35 +1351,35 @@ class SetUserLimitModal(discord.ui.Modal, title="Set User Limit"):
 
     user_limit = discord.ui.TextInput(label="User Limit (0 for no limit)", placeholder="Enter number of users (0-99)...")
 
+    @ack_first()
     async def on_submit(self, interaction: discord.Interaction):
-        from data import load_temp_channels, save_temp_channels
-        temp_channels = load_temp_channels()
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
+        info = channel_store.get(self.channel_id)
+        if info is None:
+            await reply(interaction, "❌ Channel not found.", ephemeral=True)
             return
 
         try:
             limit = int(self.user_limit.value)
             if limit < 0 or limit > 99:
-                await interaction.response.send_message("❌ User limit must be between 0 and 99 (0 = no limit).", ephemeral=True)
+                await reply(interaction, "❌ User limit must be between 0 and 99 (0 = no limit).", ephemeral=True)
                 return
 
             channel = interaction.guild.get_channel(self.channel_id)
             if not channel:
-                await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
+                await reply(interaction, "❌ Channel not found.", ephemeral=True)
                 return
 
             try:
-                await channel.edit(user_limit=limit if limit > 0 else None, reason="User limit changed by owner")
-                temp_channels[self.channel_id]["user_limit"] = limit if limit > 0 else None
-                save_temp_channels(temp_channels)
+                await rest_queue.submit(channel.edit(user_limit=limit if limit > 0 else None, reason="User limit changed by owner"), USER, "channel_edit", channel.id)
+                info.user_limit = limit if limit > 0 else None
+                channel_store.save(self.channel_id, "limit")
 
                 limit_text = f"{limit} users" if limit > 0 else "No limit"
-                await interaction.response.send_message(f"✅ User limit set to: **{limit_text}**", ephemeral=True)
+                await reply(interaction, f"✅ User limit set to: **{limit_text}**", ephemeral=True)
             except discord.Forbidden:
-                await interaction.response.send_message("❌ I don't have permission to edit the channel.", ephemeral=True)
+                await reply(interaction, "❌ I don't have permission to edit the channel.", ephemeral=True)
         except ValueError:
-            await interaction.response.send_message("❌ Please enter a valid number.", ephemeral=True)
+            await reply(interaction, "❌ Please enter a valid number.", ephemeral=True)
 
 class ManagePendingRequestsView(discord.ui.View):
     def __init__(self, channel_id, owner_id, pending_requests):
@@ -1308,101 +1391,152 @@ class ManagePendingRequestsView(discord.ui.View):
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         return interaction.user.id == self.owner_id
 
-    @discord.ui.button(label="Approve Request", style=discord.ButtonStyle.green, emoji="✅")
-    async def approve_request(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if not self.pending_requests:
-            await interaction.response.send_message("❌ No pending requests.", ephemeral=True)
-            return
-
+    def build_select(self, guild, approve):
+        """Multi-select of pending requesters (Discord allows at most 25 options)."""
         options = []
         for user_id in self.pending_requests:
-            user = interaction.guild.get_member(user_id)
+            user = guild.get_member(user_id)
             if user:
                 options.append(discord.SelectOption(label=user.display_name, value=str(user_id)))
-
+            if len(options) == 25:
+                break
         if not options:
-            await interaction.response.send_message("❌ No valid pending requests found.", ephemeral=True)
-            return
+            return None
+        select = discord.ui.Select(
+            placeholder="Select users to approve..." if approve else "Select users to deny...",
+            options=options,
+            min_values=1,
+            max_values=len(options)
+        )
 
-        select = discord.ui.Select(placeholder="Select user to approve...", options=options)
+        async def select_callback(select_interaction: discord.Interaction):
+            user_ids = [int(value) for value in select_interaction.data['values']]
+            await self.process_requests(select_interaction, user_ids, approve)
 
-        async def approve_callback(select_interaction: discord.Interaction):
-            user_id = int(select_interaction.data['values'][0])
-            await self.process_request(select_interaction, user_id, approve=True)
+        select.callback = select_callback
+        return select
 
-        select.callback = approve_callback
-        view = discord.ui.View(timeout=60)
-        view.add_item(select)
-        await interaction.response.send_message("Select a user to approve:", view=view, ephemeral=True)
+    @discord.ui.button(label="Approve Request", style=discord.ButtonStyle.green, emoji="✅")
+    async def approve_request(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.send_select(interaction, approve=True)
 
     @discord.ui.button(label="Deny Request", style=discord.ButtonStyle.red, emoji="❌")
     async def deny_request(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.send_select(interaction, approve=False)
+
+    @discord.ui.button(label="Approve All", style=discord.ButtonStyle.green, emoji="✅", row=1)
+    async def approve_all(self, interaction: discord.Interaction, button: discord.ui.Button):
+        info = channel_store.get(self.channel_id)
+        await self.process_requests(interaction, list(info.pending_requests) if info else [], approve=True)
+
+    @discord.ui.button(label="Deny All", style=discord.ButtonStyle.red, emoji="❌", row=1)
+    async def deny_all(self, interaction: discord.Interaction, button: discord.ui.Button):
+        info = channel_store.get(self.channel_id)
+        await self.process_requests(interaction, list(info.pending_requests) if info else [], approve=False)
+
+    async def send_select(self, interaction: discord.Interaction, approve: bool):
         if not self.pending_requests:
             await interaction.response.send_message("❌ No pending requests.", ephemeral=True)
             return
 
-        options = []
-        for user_id in self.pending_requests:
-            user = interaction.guild.get_member(user_id)
-            if user:
-                options.append(discord.SelectOption(label=user.display_name, value=str(user_id)))
-
-        if not options:
+        select = self.build_select(interaction.guild, approve)
+        if select is None:
             await interaction.response.send_message("❌ No valid pending requests found.", ephemeral=True)
             return
 
-        select = discord.ui.Select(placeholder="Select user to deny...", options=options)
-
-        async def deny_callback(select_interaction: discord.Interaction):
-            user_id = int(select_interaction.data['values'][0])
-            await self.process_request(select_interaction, user_id, approve=False)
-
-        select.callback = deny_callback
         view = discord.ui.View(timeout=60)
         view.add_item(select)
-        await interaction.response.send_message("Select a user to deny:", view=view, ephemeral=True)
-
-    async def process_request(self, interaction: discord.Interaction, user_id: int, approve: bool):
-        from data import load_temp_channels, save_temp_channels
-        temp_channels = load_temp_channels()
-
-        if self.channel_id not in temp_channels:
-            await interaction.response.send_message("❌ Channel not found!", ephemeral=True)
-            return
-
-        info = temp_channels[self.channel_id]
-        if user_id not in info.get("pending_requests", []):
-            await interaction.response.send_message("❌ Request not found!", ephemeral=True)
-            return
-
-        info["pending_requests"].remove(user_id)
-        save_temp_channels(temp_channels)
-
-        user = interaction.guild.get_member(user_id)
-        channel = interaction.guild.get_channel(self.channel_id)
-
-        if approve:
-            # Grant access
-            if channel and user:
-                try:
-                    overwrites = channel.overwrites
-                    overwrites[user] = discord.PermissionOverwrite(connect=True, view_channel=True)
-                    await channel.edit(overwrites=overwrites, reason="Join request approved")
-
-                    # Notify user
-                    try:
-                        await user.send(f"✅ Your request to join **{channel.name}** in **{interaction.guild.name}** has been approved!")
-                    except:
-                        pass
-
-                    await interaction.response.send_message(f"✅ Approved {user.display_name}'s request!", ephemeral=True)
-                except discord.Forbidden:
-                    await interaction.response.send_message("❌ I don't have permission to edit the channel.", ephemeral=True)
-        else:
-            # Deny request
-            if user and channel:
-                try:
-                    await user.send(f"❌ Your request to join **{channel.name}** in **{interaction.guild.name}** has been denied.")
-                except:
-                    pass
-                await interaction.response.send_message(f"❌ Denied {user.display_name}'s request.", ephemeral=True)
+        action = "approve" if approve else "deny"
+        await interaction.response.send_message(f"Select users to {action}:", view=view, ephemeral=True)
+
+    @ack_first()
+    async def process_requests(self, interaction: discord.Interaction, user_ids, approve: bool):
+        processed = await process_join_requests(interaction, interaction.guild, self.channel_id, user_ids, approve)
+        self.pending_requests = [uid for uid in self.pending_requests if uid not in processed]
+
+async def process_join_requests(interaction: discord.Interaction, guild, channel_id, user_ids, approve: bool):
+    """Approve or deny a batch of requests with one store save and one permission update.
+
+    Returns the IDs of the requests that were still pending.
+    """
+    info = channel_store.get(channel_id)
+    if info is None:
+        await reply(interaction, "❌ Channel not found!", ephemeral=True)
+        return []
+
+    processed = info.remove_requests(user_ids)
+    if not processed:
+        await reply(interaction, "❌ Request not found or already processed!", ephemeral=True)
+        return processed
+
+    channel_store.save(channel_id, "approve" if approve else "deny")
+
+    channel = guild.get_channel(channel_id)
+    users = [user for user in map(guild.get_member, processed) if user]
+    if not channel or not users:
+        await reply(interaction, "❌ Channel or user not found!", ephemeral=True)
+        return processed
+
+    if approve:
+        try:
+            # The whole batch goes out as one channel edit
+            await overwrite_manager.update_many(
+                channel,
+                {user: discord.PermissionOverwrite(connect=True, view_channel=True) for user in users},
+                reason="Join request approved"
+            )
+        except discord.Forbidden:
+            await reply(interaction, "❌ I don't have permission to edit the channel.", ephemeral=True)
+            return processed
+        message = f"✅ Your request to join **{channel.name}** in **{guild.name}** has been approved!"
+    else:
+        message = f"❌ Your request to join **{channel.name}** in **{guild.name}** has been denied."
+
+    # Notifications go out concurrently in the background
+    for user in users:
+        dm_service.notify(user, message)
+
+    names = ", ".join(user.display_name for user in users[:20])
+    if len(users) > 20:
+        names += f" and {len(users) - 20} more"
+    if approve:
+        await reply(interaction, f"✅ Approved {len(users)} request(s): {names}", ephemeral=True)
+    else:
+        await reply(interaction, f"❌ Denied {len(users)} request(s): {names}", ephemeral=True)
+    return processed
+
+@router.route("join_approve")
+@ack_first()
+async def join_approve(interaction: discord.Interaction, channel_id, requester_id):
+    await answer_join_request(interaction, channel_id, int(requester_id), approve=True)
+
+@router.route("join_deny")
+@ack_first()
+async def join_deny(interaction: discord.Interaction, channel_id, requester_id):
+    await answer_join_request(interaction, channel_id, int(requester_id), approve=False)
+
+async def answer_join_request(interaction: discord.Interaction, channel_id, requester_id, approve: bool):
+    """Approve/Deny from the owner's DM, resolved against the store so it works after restarts."""
+    info = channel_store.get(channel_id)
+    if info is None:
+        await reply(interaction, "❌ Channel no longer exists!", ephemeral=True)
+        return
+
+    # Ownership may have been transferred since the DM was sent
+    if info.owner_id != interaction.user.id:
+        await reply(interaction, "❌ Only the channel owner can answer join requests.", ephemeral=True)
+        return
+
+    guild = interaction.client.get_guild(info.guild_id) if info.guild_id else None
+    if guild is None:
+        await reply(interaction, "❌ Server not found!", ephemeral=True)
+        return
+
+    await process_join_requests(interaction, guild, channel_id, [requester_id], approve)
+
+def join_request_view(channel_id, requester_id):
+    """Approve/Deny buttons for a join request DM."""
+    return router.view(
+        router.button("join_approve", channel_id, requester_id, label="Approve", style=discord.ButtonStyle.green, emoji="✅"),
+        router.button("join_deny", channel_id, requester_id, label="Deny", style=discord.ButtonStyle.red, emoji="❌"),
+    )
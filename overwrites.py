@@ -0,0 +1,125 @@
+import asyncio
+import contextlib
+
+import discord
+
+from rest_queue import rest_queue, USER
+
+# Changes to the same channel requested within this many seconds of each
+# other are flushed together, keeping only the last change per target
+COALESCE_WINDOW = 0.25
+
+class _PendingChannel:
+    __slots__ = ("channel", "changes", "reasons", "futures", "priority")
+
+    def __init__(self, channel, priority):
+        self.channel = channel
+        self.changes = {}
+        self.reasons = []
+        self.futures = []
+        self.priority = priority
+
+class OverwriteManager:
+    """Applies permission overwrite changes without clobbering other targets.
+
+    update() uses the per-target endpoint (channel.set_permissions), so the
+    rest of the overwrite map is never re-sent and changes to different
+    targets can't undo each other. Changes to one channel that arrive
+    within COALESCE_WINDOW are deduplicated (the last change per target
+    wins) but still go out as one call per target.
+
+    update_many() is for batches (bulk approve): it fetches the channel's
+    current overwrites from the API and sends the whole batch as a single
+    channel.edit. The cached channel.overwrites lags behind until the
+    gateway confirms an edit, so it is never used to build a full map.
+
+    All writes to one channel are serialized by a per-channel lock.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._locks = {}
+        self._tasks = set()
+
+    async def update(self, channel, target, overwrite, reason=None, priority=USER):
+        """Set target's overwrite on channel (None removes it); waits until applied and re-raises errors."""
+        pending = self._pending.get(channel.id)
+        if pending is None:
+            pending = self._pending[channel.id] = _PendingChannel(channel, priority)
+            task = asyncio.get_running_loop().create_task(self._flush_later(channel.id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        pending.channel = channel
+        pending.changes[target] = overwrite
+        pending.priority = min(pending.priority, priority)
+        if reason and reason not in pending.reasons:
+            pending.reasons.append(reason)
+        future = asyncio.get_running_loop().create_future()
+        pending.futures.append(future)
+        await future
+
+    async def update_many(self, channel, changes, reason=None, priority=USER):
+        """Apply {target: overwrite or None} to channel in one request, built from freshly fetched state."""
+        if len(changes) == 1:
+            (target, overwrite), = changes.items()
+            await self.update(channel, target, overwrite, reason=reason, priority=priority)
+            return
+        async with self._channel_lock(channel.id):
+            fresh = await rest_queue.submit(channel.guild.fetch_channel(channel.id), priority, "channel_fetch", channel.id)
+            # Keyed by ID: fetched targets not in the member cache are discord.Objects
+            by_id = {target.id: (target, overwrite) for target, overwrite in fresh.overwrites.items()}
+            for target, overwrite in changes.items():
+                if overwrite is None:
+                    by_id.pop(target.id, None)
+                else:
+                    by_id[target.id] = (target, overwrite)
+            await rest_queue.submit(
+                fresh.edit(overwrites=dict(by_id.values()), reason=reason), priority, "channel_edit", channel.id
+            )
+
+    @contextlib.asynccontextmanager
+    async def _channel_lock(self, channel_id):
+        # [lock, holders and waiters]; dropped once nobody needs it
+        entry = self._locks.get(channel_id)
+        if entry is None:
+            entry = self._locks[channel_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[channel_id]
+
+    async def _flush_later(self, channel_id):
+        await asyncio.sleep(COALESCE_WINDOW)
+        async with self._channel_lock(channel_id):
+            pending = self._pending.pop(channel_id)
+            try:
+                await self._apply(pending)
+            except Exception as e:
+                for future in pending.futures:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for future in pending.futures:
+                    if not future.done():
+                        future.set_result(None)
+
+    async def _apply(self, pending):
+        channel = pending.channel
+        reason = "; ".join(pending.reasons) or None
+        results = await asyncio.gather(*(
+            rest_queue.submit(
+                channel.set_permissions(target, overwrite=overwrite, reason=reason), pending.priority, "permission_edit", channel.id
+            )
+            for target, overwrite in pending.changes.items()
+        ), return_exceptions=True)
+        for result in results:
+            if isinstance(result, discord.NotFound):
+                continue  # Removing an overwrite that is already gone
+            if isinstance(result, Exception):
+                raise result
+
+overwrite_manager = OverwriteManager()
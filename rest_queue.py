@@ -0,0 +1,184 @@
+import asyncio
+import itertools
+import os
+import time
+
+# Priority classes; lower runs first
+USER = 0          # REST calls made on behalf of a click or command
+BACKGROUND = 1    # expiry teardown, deleting user messages in menu channels
+MAINTENANCE = 2   # periodic menu channel purges
+
+PRIORITY_NAMES = {USER: "user", BACKGROUND: "background", MAINTENANCE: "maintenance"}
+
+# Idle, fully refilled budgets are dropped once there are more than this many
+MAX_BUDGETS = 4096
+
+# How many REST calls run at once
+REST_WORKERS = int(os.getenv("ECHONET_REST_WORKERS", "4"))
+
+# Local budgets per route as (calls, per seconds), kept separately for each
+# bucket key a call is submitted with (the channel or guild ID, the same
+# resource Discord keys its own buckets on). They sit just under Discord's
+# limits so background work doesn't run a bucket dry and leave user actions
+# on the same channel waiting on a 429; discord.py still handles any 429.
+ROUTE_BUDGETS = {
+    "channel_create": (5, 5.0),
+    "channel_edit": (5, 5.0),
+    "channel_delete": (5, 5.0),
+    "permission_edit": (5, 5.0),
+    "member_move": (5, 5.0),
+    "dm": (5, 5.0),
+    "message_send": (5, 5.0),
+    "message_delete": (5, 5.0),
+    "bulk_delete": (1, 1.0),
+}
+
+class _Budget:
+    """Token bucket refilled continuously at limit/per tokens per second."""
+
+    def __init__(self, limit, per):
+        self.limit = limit
+        self.per = per
+        self.tokens = float(limit)
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.limit, self.tokens + (now - self.updated) * self.limit / self.per)
+        self.updated = now
+
+    def delay(self):
+        """Seconds until a call may go out (0 if it can go now)."""
+        self.refill()
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) * self.per / self.limit
+
+    def take(self):
+        self.tokens -= 1
+
+class _Job:
+    __slots__ = ("coro", "priority", "route", "key", "future", "submitted")
+
+    def __init__(self, coro, priority, route, key, future):
+        self.coro = coro
+        self.priority = priority
+        self.route = route
+        self.key = key
+        self.future = future
+        self.submitted = time.monotonic()
+
+class RestQueue:
+    """Outbound Discord REST calls, run in priority order by a few workers.
+
+    Callers hand over the coroutine for one REST call and await its result:
+
+        await rest_queue.submit(channel.delete(), BACKGROUND, "channel_delete", channel.id)
+
+    A job whose route is out of budget for its key is parked until the
+    budget refills instead of holding a worker, so other channels, routes
+    and higher priorities keep moving. Only leaf REST calls should be submitted: a job that itself
+    waits on the queue could starve the workers.
+    """
+
+    def __init__(self, workers=REST_WORKERS, budgets=ROUTE_BUDGETS):
+        self.workers = workers
+        self._limits = budgets
+        # (route, key) -> _Budget, created on first use
+        self._budgets = {}
+        self._queue = None
+        self._tasks = []
+        self._seq = itertools.count()
+        self._depth = dict.fromkeys(PRIORITY_NAMES, 0)
+        # Per priority: [jobs started, total seconds waited, longest wait]
+        self._waits = {priority: [0, 0.0, 0.0] for priority in PRIORITY_NAMES}
+
+    def _start(self):
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        self._tasks = [task for task in self._tasks if not task.done()]
+        loop = asyncio.get_running_loop()
+        while len(self._tasks) < self.workers:
+            self._tasks.append(loop.create_task(self._worker()))
+
+    def _put(self, job, seq):
+        self._queue.put_nowait((job.priority, seq, job))
+
+    def _budget(self, route, key):
+        limit = self._limits.get(route)
+        if limit is None:
+            return None
+        budget = self._budgets.get((route, key))
+        if budget is None:
+            if len(self._budgets) >= MAX_BUDGETS:
+                self._prune()
+            budget = self._budgets[(route, key)] = _Budget(*limit)
+        return budget
+
+    def _prune(self):
+        for bucket, budget in list(self._budgets.items()):
+            budget.refill()
+            if budget.tokens >= budget.limit:
+                del self._budgets[bucket]
+
+    async def submit(self, coro, priority=USER, route=None, key=None):
+        """Queue a REST call and return its result (or raise its exception).
+
+        key is the channel or guild ID the call acts on; calls on the same
+        route share a budget only if they share a key.
+        """
+        self._start()
+        job = _Job(coro, priority, route, key, asyncio.get_running_loop().create_future())
+        self._depth[priority] += 1
+        self._put(job, next(self._seq))
+        return await job.future
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, seq, job = await self._queue.get()
+            if job.future.cancelled():
+                self._depth[job.priority] -= 1
+                job.coro.close()
+                continue
+            budget = self._budget(job.route, job.key)
+            wait = budget.delay() if budget else 0
+            if wait > 0:
+                # Park it, keeping its place in line for when it comes back
+                loop.call_later(wait, self._put, job, seq)
+                continue
+            if budget:
+                budget.take()
+            self._depth[job.priority] -= 1
+            waited = time.monotonic() - job.submitted
+            stats = self._waits[job.priority]
+            stats[0] += 1
+            stats[1] += waited
+            stats[2] = max(stats[2], waited)
+            try:
+                result = await job.coro
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def stats(self):
+        """Queue depth and average/max wait (seconds) per priority class."""
+        return {
+            PRIORITY_NAMES[priority]: {
+                "queued": self._depth[priority],
+                "started": started,
+                "avg_wait": total / started if started else 0.0,
+                "max_wait": longest,
+            }
+            for priority, (started, total, longest) in self._waits.items()
+        }
+
+rest_queue = RestQueue()
@@ -0,0 +1,60 @@
+import discord
+
+PREFIX = "echonet"
+
+class ComponentRouter:
+    """Routes component clicks by custom_id instead of per-message View objects.
+
+    A custom_id has the form "echonet:<action>:<id>[:<arg>...]", where id
+    is usually a channel ID. Handlers are registered per action and called
+    as handler(interaction, id, *args) from a single dict lookup in
+    dispatch(), so nothing has to stay in memory per message and buttons
+    keep working after a restart.
+    """
+
+    def __init__(self):
+        self.handlers = {}
+
+    def route(self, action):
+        """Decorator registering the handler for an action."""
+        def decorator(handler):
+            self.handlers[action] = handler
+            return handler
+        return decorator
+
+    def custom_id(self, action, target_id, *args):
+        return ":".join([PREFIX, action, str(target_id), *map(str, args)])
+
+    def button(self, action, target_id, *args, **kwargs):
+        """A discord.ui.Button whose clicks are routed to action's handler."""
+        return discord.ui.Button(custom_id=self.custom_id(action, target_id, *args), **kwargs)
+
+    def select(self, action, target_id, *args, **kwargs):
+        """A discord.ui.Select whose choices are routed to action's handler (read interaction.data['values'])."""
+        return discord.ui.Select(custom_id=self.custom_id(action, target_id, *args), **kwargs)
+
+    def view(self, *items):
+        """Lay out routed items in a View that discord.py won't keep in its view store."""
+        view = discord.ui.View(timeout=None)
+        for item in items:
+            view.add_item(item)
+        # A finished view is sent as plain components and not tracked
+        view.stop()
+        return view
+
+    async def dispatch(self, interaction):
+        """Run the handler for a routed component interaction. Returns True if it was one of ours."""
+        if interaction.type != discord.InteractionType.component:
+            return False
+        custom_id = interaction.data.get("custom_id", "")
+        prefix, _, rest = custom_id.partition(":")
+        if prefix != PREFIX:
+            return False
+        action, target_id, *args = rest.split(":")
+        handler = self.handlers.get(action)
+        if handler is None:
+            return False
+        await handler(interaction, int(target_id), *args)
+        return True
+
+router = ComponentRouter()
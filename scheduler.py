@@ -0,0 +1,103 @@
+import asyncio
+import heapq
+import time
+
+# Upper bound on one sleep, so a wall-clock jump (suspend, NTP step) is
+# noticed within this many seconds even when no deadline changes.
+MAX_SLEEP = 3600
+
+class ExpiryScheduler:
+    """Min-heap of deadlines that sleeps until the earliest one is due.
+
+    Keys are channel IDs for channel expiry; jobs.py reuses it with job keys.
+
+    schedule() and cancel() are O(log N). Superseded heap entries are not
+    removed in place; they are skipped when they reach the top (and the heap
+    is rebuilt if they pile up), with _deadlines holding the live deadline
+    for each channel.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._deadlines = {}
+        self._wake = asyncio.Event()
+        self._task = None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def schedule(self, channel_id, expires_at):
+        """Set (or move) a channel's deadline, in epoch seconds."""
+        if self._deadlines.get(channel_id) == expires_at:
+            return
+        self._deadlines[channel_id] = expires_at
+        heapq.heappush(self._heap, (expires_at, channel_id))
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(deadline, cid) for cid, deadline in self._deadlines.items()]
+            heapq.heapify(self._heap)
+        if self._heap[0] == (expires_at, channel_id):
+            # New earliest deadline: cut the current sleep short
+            self._wake.set()
+
+    def cancel(self, channel_id):
+        self._deadlines.pop(channel_id, None)
+
+    def on_channel_changed(self, channel_id, info):
+        """Channel store listener: track a channel's current expiry, or drop it once removed."""
+        if info is None:
+            self.cancel(channel_id)
+        else:
+            self.schedule(channel_id, info.expires_at)
+
+    def next_deadline(self):
+        """Earliest live deadline, or None if nothing is scheduled."""
+        while self._heap:
+            deadline, channel_id = self._heap[0]
+            if self._deadlines.get(channel_id) == deadline:
+                return deadline
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now):
+        """Remove and return the IDs of every channel whose deadline is at or before now."""
+        due = []
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None or deadline > now:
+                return due
+            _, channel_id = heapq.heappop(self._heap)
+            del self._deadlines[channel_id]
+            due.append(channel_id)
+
+    async def _run(self, callback):
+        while True:
+            self._wake.clear()
+            deadline = self.next_deadline()
+            timeout = MAX_SLEEP if deadline is None else min(max(deadline - time.time(), 0), MAX_SLEEP)
+            if timeout > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+            due = self.pop_due(time.time())
+            if due:
+                try:
+                    await callback(due)
+                except Exception as e:
+                    print(f"Error handling expired channels: {e}")
+
+    def start(self, callback):
+        """Run callback(channel_ids) as deadlines pass, until stop()."""
+        if not self.is_running():
+            self._task = asyncio.get_running_loop().create_task(self._run(callback))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def is_running(self):
+        return self._task is not None and not self._task.done()
+
+expiry_scheduler = ExpiryScheduler()
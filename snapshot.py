@@ -0,0 +1,138 @@
+import os
+import struct
+import sys
+from array import array
+
+# File layout (little-endian):
+#   header:   magic "ECNS", uint16 format version, uint32 record count,
+#             uint32 total number of IDs in the ID section
+#   records:  count fixed-size RECORDs, back to back
+#   ID section: every record's pending_requests then blocked_users, as one
+#             packed uint64 array, in record order
+# Keeping the fixed part contiguous lets decoding use a single
+# Struct.iter_unpack pass. IDs of 0 and a user_limit of -1 stand for None.
+MAGIC = b"ECNS"
+VERSION = 1
+HEADER = struct.Struct("<4sHII")
+RECORD = struct.Struct("<QQQqBQQhII")
+FLAG_REQUEST_ONLY = 1
+
+class SnapshotError(ValueError):
+    """Raised when a binary snapshot is corrupt or from an unknown format version."""
+
+def encode_rows(rows):
+    """Pack channel rows (as produced by TempChannel.to_dict) into bytes."""
+    records = []
+    ids = array("Q")
+    for channel_id, info in rows.items():
+        user_limit = info["user_limit"]
+        records.append(RECORD.pack(
+            int(channel_id),
+            info.get("guild_id") or 0,
+            info["owner_id"],
+            info["expires_at"],
+            FLAG_REQUEST_ONLY if info["request_only"] else 0,
+            info["menu_message_id"] or 0,
+            info["menu_channel_id"] or 0,
+            -1 if user_limit is None else user_limit,
+            len(info["pending_requests"]),
+            len(info["blocked_users"]),
+        ))
+        ids.extend(info["pending_requests"])
+        ids.extend(info["blocked_users"])
+    header = HEADER.pack(MAGIC, VERSION, len(records), len(ids))
+    return header + b"".join(records) + ids.tobytes()
+
+def decode_records(data):
+    """Unpack a snapshot into {channel_id: record tuple} without building dicts.
+
+    Keys are int channel IDs (JSON snapshots have string keys; the loaders
+    accept both). Empty ID lists are the shared empty tuple, so the common
+    record with no requests or blocks allocates nothing for them. Each
+    tuple is (owner_id,
+    guild_id, expires_at, request_only, pending_requests, blocked_users,
+    menu_message_id, menu_channel_id, user_limit), the argument order of
+    TempChannel.from_record.
+    """
+    if len(data) < HEADER.size:
+        raise SnapshotError("snapshot is truncated")
+    magic, version, count, id_count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError("not an EchoNet snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"unsupported snapshot version {version}")
+    records_end = HEADER.size + count * RECORD.size
+    if len(data) != records_end + id_count * 8:
+        raise SnapshotError("snapshot is truncated")
+
+    ids = array("Q")
+    ids.frombytes(data[records_end:])
+    ids = ids.tolist()
+    rows = {}
+    pos = 0
+    for (channel_id, guild_id, owner_id, expires_at, flags, menu_message_id,
+         menu_channel_id, user_limit, pending_count, blocked_count) in RECORD.iter_unpack(data[HEADER.size:records_end]):
+        if pending_count:
+            pending = ids[pos:pos + pending_count]
+            pos += pending_count
+        else:
+            pending = ()
+        if blocked_count:
+            blocked = ids[pos:pos + blocked_count]
+            pos += blocked_count
+        else:
+            blocked = ()
+        rows[channel_id] = (
+            owner_id,
+            guild_id or None,
+            expires_at,
+            flags & FLAG_REQUEST_ONLY == FLAG_REQUEST_ONLY,
+            pending,
+            blocked,
+            menu_message_id or None,
+            menu_channel_id or None,
+            None if user_limit == -1 else user_limit,
+        )
+    return rows
+
+def read_snapshot(path):
+    with open(path, "rb") as f:
+        return decode_records(f.read())
+
+def write_snapshot_atomic(path, rows):
+    """Write a binary snapshot via a temp file and rename, like write_json_atomic."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode_rows(rows))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def convert(to_format):
+    """Rewrite every channel snapshot (shared file and guild shards) in the given format."""
+    from data import CHANNELS_FILE, CHANNELS_DIR, JsonBackend, deserialize_temp_channels, serialize_temp_channels
+
+    backend = JsonBackend()
+    bases = {os.path.splitext(CHANNELS_FILE)[0]}
+    if os.path.isdir(CHANNELS_DIR):
+        for name in os.listdir(CHANNELS_DIR):
+            base, ext = os.path.splitext(name)
+            if ext in (".json", ".bin"):
+                bases.add(os.path.join(CHANNELS_DIR, base))
+    converted = 0
+    for base in sorted(bases):
+        rows = backend.read_snapshot(base)
+        if rows is None:
+            continue
+        # Round-trip through TempChannel to normalize legacy rows (ISO expiry, missing keys)
+        rows = serialize_temp_channels(deserialize_temp_channels(rows))
+        backend.write_snapshot(base, rows, to_format)
+        converted += 1
+    return converted
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != "convert" or sys.argv[2] not in ("binary", "json"):
+        print("Usage: python snapshot.py convert binary|json")
+        sys.exit(1)
+    count = convert(sys.argv[2])
+    print(f"✅ Converted {count} channel snapshot(s) to {sys.argv[2]}")
@@ -0,0 +1,185 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+from data import JsonBackend, DB_FILE, CHANNELS_DIR, to_epoch, deserialize_temp_channels, serialize_temp_channels
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS temp_channels (
+    channel_id INTEGER PRIMARY KEY,
+    guild_id INTEGER,
+    owner_id INTEGER NOT NULL,
+    expires_at INTEGER NOT NULL,
+    request_only INTEGER NOT NULL,
+    pending_requests TEXT NOT NULL DEFAULT '[]',
+    blocked_users TEXT NOT NULL DEFAULT '[]',
+    menu_message_id INTEGER,
+    menu_channel_id INTEGER,
+    user_limit INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_temp_channels_owner ON temp_channels (owner_id);
+CREATE INDEX IF NOT EXISTS idx_temp_channels_guild ON temp_channels (guild_id);
+CREATE INDEX IF NOT EXISTS idx_temp_channels_expires ON temp_channels (expires_at);
+CREATE TABLE IF NOT EXISTS guild_settings (
+    guild_id TEXT PRIMARY KEY,
+    settings TEXT NOT NULL
+);
+"""
+
+UPSERT_CHANNEL = """
+INSERT INTO temp_channels (
+    channel_id, guild_id, owner_id, expires_at, request_only,
+    pending_requests, blocked_users, menu_message_id, menu_channel_id, user_limit
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (channel_id) DO UPDATE SET
+    guild_id = excluded.guild_id,
+    owner_id = excluded.owner_id,
+    expires_at = excluded.expires_at,
+    request_only = excluded.request_only,
+    pending_requests = excluded.pending_requests,
+    blocked_users = excluded.blocked_users,
+    menu_message_id = excluded.menu_message_id,
+    menu_channel_id = excluded.menu_channel_id,
+    user_limit = excluded.user_limit
+"""
+
+UPSERT_SETTINGS = """
+INSERT INTO guild_settings (guild_id, settings) VALUES (?, ?)
+ON CONFLICT (guild_id) DO UPDATE SET settings = excluded.settings
+"""
+
+class SQLiteBackend:
+    """SQLite storage in WAL mode with one row per channel and per guild.
+
+    Channel writes are per-row upserts and deletes, so a change to one
+    channel no longer rewrites the others. The connection is shared by the
+    worker threads the channel store flushes from, guarded by a lock.
+    """
+
+    incremental = True
+    lazy = True
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # Last JSON written per guild, so save_settings only touches changed rows
+        self._settings_cache = {}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def load_settings(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT guild_id, settings FROM guild_settings").fetchall()
+        self._settings_cache = {row["guild_id"]: row["settings"] for row in rows}
+        return {guild_id: json.loads(raw) for guild_id, raw in self._settings_cache.items()}
+
+    def save_settings(self, settings):
+        encoded = {str(guild_id): json.dumps(value, sort_keys=True) for guild_id, value in settings.items()}
+        changed = [(guild_id, raw) for guild_id, raw in encoded.items() if self._settings_cache.get(guild_id) != raw]
+        removed = [(guild_id,) for guild_id in self._settings_cache if guild_id not in encoded]
+        if not changed and not removed:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(UPSERT_SETTINGS, changed)
+            self._conn.executemany("DELETE FROM guild_settings WHERE guild_id = ?", removed)
+        self._settings_cache = encoded
+
+    def _row_to_channel(self, row):
+        return {
+            "owner_id": row["owner_id"],
+            "guild_id": row["guild_id"],
+            "expires_at": row["expires_at"],
+            "request_only": bool(row["request_only"]),
+            "pending_requests": json.loads(row["pending_requests"]),
+            "menu_message_id": row["menu_message_id"],
+            "menu_channel_id": row["menu_channel_id"],
+            "blocked_users": json.loads(row["blocked_users"]),
+            "user_limit": row["user_limit"],
+        }
+
+    def _channel_params(self, channel_id, info):
+        return (
+            int(channel_id),
+            info.get("guild_id"),
+            info["owner_id"],
+            to_epoch(info["expires_at"]),
+            int(bool(info["request_only"])),
+            json.dumps(info.get("pending_requests", [])),
+            json.dumps(info.get("blocked_users", [])),
+            info.get("menu_message_id"),
+            info.get("menu_channel_id"),
+            info.get("user_limit"),
+        )
+
+    def _select_channels(self, where="", params=()):
+        with self._lock:
+            rows = self._conn.execute(f"SELECT * FROM temp_channels {where}", params).fetchall()
+        return {str(row["channel_id"]): self._row_to_channel(row) for row in rows}
+
+    def load_channels(self, guild_id=None):
+        """Rows for one guild, or rows not yet tied to a guild (the guild_id index is the partition)."""
+        if guild_id is None:
+            return self._select_channels("WHERE guild_id IS NULL")
+        return self._select_channels("WHERE guild_id = ?", (guild_id,))
+
+    def write_channels(self, rows, removed=None, full=False, ops=None):
+        """Upsert the given rows and delete removed IDs in one transaction."""
+        params = [self._channel_params(channel_id, info) for channel_id, info in rows.items()]
+        with self._lock, self._conn:
+            self._conn.executemany(UPSERT_CHANNEL, params)
+            self._conn.executemany("DELETE FROM temp_channels WHERE channel_id = ?", [(int(cid),) for cid in removed or ()])
+
+    def shard_for(self, guild_id):
+        return None
+
+    def shards_to_compact(self):
+        # Rows are updated in place; there is no journal to fold
+        return set()
+
+    def delete_guild(self, guild_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM temp_channels WHERE guild_id = ?", (guild_id,))
+
+def migrate_from_json(db_path=DB_FILE):
+    """One-shot copy of the JSON channel data and echonet_settings.json into SQLite.
+
+    Reads the shared channels file and every per-guild shard in
+    CHANNELS_DIR (with their journals), whichever layout wrote them.
+    Existing rows with the same IDs are overwritten; the JSON files are left
+    untouched so the migration can be re-run or rolled back.
+    """
+    source = JsonBackend(sharded=True)
+    settings = source.load_settings()
+    rows = source.load_channels()
+    if os.path.isdir(CHANNELS_DIR):
+        guild_ids = {name.split(".", 1)[0] for name in os.listdir(CHANNELS_DIR)}
+        for guild_id in sorted(guild_id for guild_id in guild_ids if guild_id.isdigit()):
+            rows.update(source.load_channels(int(guild_id)))
+    # Normalize through TempChannel: snapshot rows may be binary records or legacy dicts
+    channels = serialize_temp_channels(deserialize_temp_channels(rows))
+
+    target = SQLiteBackend(db_path)
+    try:
+        existing = target.load_settings()
+        target.save_settings({**existing, **settings})
+        target.write_channels(channels)
+    finally:
+        target.close()
+    return len(channels), len(settings)
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ["migrate"]:
+        print("Usage: python sqlite_store.py migrate [db_path]")
+        sys.exit(1)
+    db_path = sys.argv[2] if len(sys.argv) > 2 else DB_FILE
+    channel_count, guild_count = migrate_from_json(db_path)
+    print(f"✅ Migrated {channel_count} channels and {guild_count} guild settings into {db_path}")
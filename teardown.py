@@ -0,0 +1,79 @@
+import asyncio
+import os
+
+import discord
+
+from data import channel_store, epoch_now
+from dm_service import dm_service
+from perms import check_voice_channel_permissions
+from rest_queue import rest_queue, BACKGROUND
+from scheduler import expiry_scheduler
+
+# How many expired channels are torn down at once
+TEARDOWN_CONCURRENCY = int(os.getenv("ECHONET_TEARDOWN_CONCURRENCY", "10"))
+# Delay before retrying a channel whose voice channel could not be deleted
+RETRY_DELAY = 300
+
+# Failure counts per step since startup, e.g. {"delete_channel": 2}
+teardown_failures = {}
+
+async def _run_step(channel_id, step, coro, failures):
+    try:
+        # dm_service.send reports an undelivered DM by returning False
+        if await coro is False:
+            raise RuntimeError("not delivered")
+    except discord.NotFound:
+        pass  # Already gone, which is the goal
+    except Exception as e:
+        failures[step] = e
+        teardown_failures[step] = teardown_failures.get(step, 0) + 1
+        print(f"Teardown step {step} failed for channel {channel_id}: {e}")
+
+async def teardown_channel(bot, channel_id, info):
+    """Delete the voice channel and its menu message concurrently, then notify the owner.
+
+    The owner is only told once the delete went through, so a failed
+    delete (retried later) never sends a premature or repeated notice.
+    Returns {step: exception} for every step that failed.
+    """
+    failures = {}
+    guild = bot.get_guild(info.guild_id) if info.guild_id else None
+    channel = guild.get_channel(channel_id) if guild else None
+    if channel is None:
+        return failures
+    steps = []
+    can_delete = not check_voice_channel_permissions(channel)
+    if can_delete:
+        steps.append(("delete_channel", rest_queue.submit(
+            channel.delete(reason="Time limit expired"), BACKGROUND, "channel_delete", channel_id
+        )))
+    if info.menu_message_id and info.menu_channel_id:
+        # Delete by ID; no need to fetch the message first
+        menu_message = bot.get_partial_messageable(info.menu_channel_id).get_partial_message(info.menu_message_id)
+        steps.append(("delete_menu", rest_queue.submit(menu_message.delete(), BACKGROUND, "message_delete", info.menu_channel_id)))
+    await asyncio.gather(*(_run_step(channel_id, step, coro, failures) for step, coro in steps))
+    owner = guild.get_member(info.owner_id)
+    if can_delete and "delete_channel" not in failures and owner:
+        await _run_step(channel_id, "notify_owner", dm_service.send(
+            owner, f"⏰ Your voice channel **{channel.name}** has expired and been deleted.", priority=BACKGROUND
+        ), failures)
+    return failures
+
+async def expire_channels(bot, channel_ids):
+    """Tear down expired channels, at most TEARDOWN_CONCURRENCY at a time."""
+    semaphore = asyncio.Semaphore(TEARDOWN_CONCURRENCY)
+    now = epoch_now()
+
+    async def expire(channel_id):
+        info = channel_store.get(channel_id)
+        if info is None or not info.is_expired(now):
+            return
+        async with semaphore:
+            failures = await teardown_channel(bot, channel_id, info)
+        if "delete_channel" in failures:
+            # Keep the record so the voice channel isn't leaked; try again later
+            expiry_scheduler.schedule(channel_id, epoch_now() + RETRY_DELAY)
+        else:
+            channel_store.remove(channel_id)
+
+    await asyncio.gather(*(expire(channel_id) for channel_id in channel_ids))
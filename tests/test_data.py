@@ -0,0 +1,85 @@
+import asyncio
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data
+from data import ChannelStore, JsonBackend, TempChannel
+
+FAR_FUTURE = 4102444800
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(data, "_backend", None)
+    return tmp_path
+
+def restart(monkeypatch, sharded):
+    """A fresh store and backend, as after a bot restart."""
+    monkeypatch.setattr(data, "_backend", JsonBackend(sharded=sharded))
+    store = ChannelStore()
+    store.load()
+    return store
+
+def test_switch_to_sharded_layout_keeps_channels(workdir, monkeypatch):
+    async def run():
+        store = restart(monkeypatch, sharded=False)
+        for channel_id in (1, 2, 3):
+            store.add(channel_id, TempChannel(owner_id=10, expires_at=FAR_FUTURE, request_only=False, guild_id=42))
+        await store.flush()
+
+        store = restart(monkeypatch, sharded=True)
+        await store.load_guild(42)
+        monkeypatch.setattr(data, "COMPACT_INTERVAL", 0)
+        store.add(4, TempChannel(owner_id=11, expires_at=FAR_FUTURE, request_only=False))
+        await store.flush()
+
+        store = restart(monkeypatch, sharded=True)
+        await store.load_guild(42)
+        return sorted(store.channels)
+
+    assert asyncio.run(run()) == [1, 2, 3, 4]
+
+def test_unloaded_shard_is_never_compacted(workdir, monkeypatch):
+    monkeypatch.setattr(data, "COMPACT_INTERVAL", 0)
+    backend = JsonBackend(sharded=True)
+    backend.load_channels()
+    backend.write_channels({"5": TempChannel(owner_id=1, expires_at=FAR_FUTURE, request_only=False, guild_id=42).to_dict()})
+    assert backend.shards_to_compact() == set()
+
+def test_journal_replays_over_binary_snapshot(workdir, monkeypatch):
+    monkeypatch.setattr(data, "SNAPSHOT_FORMAT", "binary")
+    async def run():
+        store = restart(monkeypatch, sharded=False)
+        for channel_id in (1, 2, 3):
+            store.add(channel_id, TempChannel(owner_id=10, expires_at=FAR_FUTURE, request_only=False))
+        store.save()
+        await store.flush()
+
+        store = restart(monkeypatch, sharded=False)
+        store.remove(2)
+        store.get(3).add_request(7)
+        store.save(3)
+        await store.flush()
+
+        store = restart(monkeypatch, sharded=False)
+        return sorted(store.channels), list(store.get(3).pending_requests)
+
+    assert asyncio.run(run()) == ([1, 3], [7])
+
+def test_empty_containers_are_shared_until_first_add():
+    first = TempChannel(owner_id=1, expires_at=FAR_FUTURE, request_only=True)
+    second = TempChannel(owner_id=2, expires_at=FAR_FUTURE, request_only=True)
+    assert first.blocked_users is second.blocked_users
+
+    assert first.block(5) and not first.block(5)
+    first.add_request(6)
+    assert 5 in first.blocked_users and list(first.pending_requests) == [6]
+    assert not second.blocked_users and not second.pending_requests
+
+    assert first.unblock(5) and first.remove_request(6)
+    assert first.blocked_users is second.blocked_users
+    assert first.pending_requests is second.pending_requests